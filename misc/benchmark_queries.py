@@ -0,0 +1,52 @@
+"""Benchmark for repeated probability queries on a single population.
+
+Run with `python misc/benchmark_queries.py`.
+"""
+
+import icepool
+
+import timeit
+
+die = 100 @ icepool.d100
+outcomes = list(range(die.min_outcome(), die.max_outcome() + 1, 37))
+
+
+def quantity_le():
+    for outcome in outcomes:
+        die.quantity('<=', outcome)
+
+
+def quantity_gt():
+    for outcome in outcomes:
+        die.quantity('>', outcome)
+
+
+def probability_le():
+    for outcome in outcomes:
+        die.probability('<=', outcome)
+
+
+def probability_ge():
+    for outcome in outcomes:
+        die.probability('>=', outcome)
+
+
+def quantile():
+    for n in range(1, 100):
+        die.quantile_low(n)
+        die.quantile_high(n)
+
+
+def nearest():
+    for outcome in outcomes:
+        die.nearest('<=', outcome)
+        die.nearest('>', outcome)
+
+
+if __name__ == '__main__':
+    for f in [
+            quantity_le, quantity_gt, probability_le, probability_ge,
+            quantile, nearest
+    ]:
+        t = timeit.timeit(f, number=20) / 20
+        print(f'{f.__name__:>16}: {t * 1000:8.3f} ms per round')
@@ -75,8 +75,10 @@ from icepool.function import (d, z, __getattr__, coin, stochastic_round,
                               consecutive, sorted_union,
                               harmonize_denominators)
 from icepool.map_tools.function import (reduce, accumulate, map, map_function,
-                                        map_and_time, mean_time_to_absorb,
+                                        map_and_time, map_iter,
+                                        mean_time_to_absorb,
                                         map_to_pool)
+from icepool.map_tools.markov_process import MarkovProcess
 
 from icepool.population.base import Population
 from icepool.population.die import implicit_convert_to_die, Die
@@ -151,7 +153,7 @@ from icepool.generator.compound_keep import CompoundKeepGenerator
 from icepool.generator.multiset_generator import MultisetGenerator
 from icepool.generator.multiset_tuple_generator import MultisetTupleGenerator
 from icepool.generator.weightless import WeightlessGenerator
-from icepool.evaluator.multiset_evaluator import MultisetEvaluator
+from icepool.evaluator.multiset_evaluator import MultisetEvaluator, memoize_transitions
 
 from icepool.population.deck import Deck
 from icepool.generator.deal import Deal
@@ -180,9 +182,10 @@ __all__ = [
     'from_rv', 'pointwise_max', 'pointwise_min', 'lowest', 'highest', 'middle',
     'min_outcome', 'max_outcome', 'consecutive', 'sorted_union',
     'harmonize_denominators', 'reduce', 'accumulate', 'map', 'map_function',
-    'map_and_time', 'mean_time_to_absorb', 'map_to_pool', 'Reroll', 'Restart',
-    'Break', 'RerollType', 'Pool', 'd_pool', 'z_pool', 'MultisetGenerator',
-    'MultisetExpression', 'MultisetEvaluator', 'Order',
+    'map_and_time', 'map_iter', 'mean_time_to_absorb', 'map_to_pool',
+    'MarkovProcess', 'Reroll', 'Restart', 'Break', 'RerollType', 'Pool',
+    'd_pool', 'z_pool', 'MultisetGenerator', 'MultisetExpression',
+    'MultisetEvaluator', 'memoize_transitions', 'Order',
     'ConflictingOrderError', 'UnsupportedOrder', 'Deck', 'Deal', 'MultiDeal',
     'multiset_function', 'MultisetParameter', 'MultisetTupleParameter',
     'NoCache', 'function', 'typing', 'evaluator', 'format_probability_inverse',
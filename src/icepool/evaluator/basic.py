@@ -6,6 +6,8 @@ import icepool
 from icepool.evaluator.multiset_evaluator import MultisetEvaluator
 from icepool.order import Order
 
+from collections import defaultdict
+
 from typing import Any, Callable, Final, Hashable, Mapping
 
 
@@ -81,6 +83,16 @@ class SumEvaluator(MultisetEvaluator[Any, Any]):
         else:
             return state + outcome * count
 
+    def next_state_batch(self, states, order, outcome, count):
+        """Implementation."""
+        if None in states:
+            return None
+        delta = self._map(outcome) * count
+        result: defaultdict[Any, int] = defaultdict(int)
+        for state, weight in states.items():
+            result[state + delta] += weight
+        return result
+
     @property
     def next_state_key(self):
         return self._next_state_key
@@ -104,6 +116,12 @@ class SizeEvaluator(MultisetEvaluator[Any, int]):
         """Implementation."""
         return state + count
 
+    def next_state_batch(self, states, order, outcome, count):
+        """Implementation."""
+        if count == 0:
+            return states
+        return {state + count: weight for state, weight in states.items()}
+
     def final_outcome(  # type: ignore
             self, final_state, order, outcomes, size) -> int:
         """Implementation."""
@@ -2,6 +2,7 @@
 
 __docformat__ = 'google'
 
+import icepool
 from icepool.evaluator.multiset_evaluator import MultisetEvaluator
 
 from abc import abstractmethod
@@ -30,7 +31,10 @@ class ComparisonEvaluator(MultisetEvaluator[Any, bool]):
         has_any, has_all = state or (False, True)
         this_any, this_all = self.any_all(left, right)
         has_all = has_all and this_all
-        has_any = has_all and (has_any or this_any)
+        if not has_all:
+            # The result is now decided regardless of the remaining outcomes.
+            return icepool.Break((False, False))
+        has_any = has_any or this_any
         return has_any, has_all
 
     def final_outcome(  # type: ignore
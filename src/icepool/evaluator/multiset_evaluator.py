@@ -6,12 +6,13 @@ from icepool.expression.multiset_expression_base import MultisetExpressionBase
 from icepool.order import Order
 
 from abc import abstractmethod
+import functools
 import itertools
 import math
 
 from icepool.typing import T, MaybeHashKeyed, U_co
 from typing import (Any, Callable, Collection, Hashable, Iterator, Mapping,
-                    Sequence, cast, TYPE_CHECKING)
+                    NamedTuple, Sequence, cast, overload, TYPE_CHECKING)
 
 if TYPE_CHECKING:
     from icepool.expression.multiset_expression_base import MultisetExpressionBase, MultisetSourceBase, Dungeonlet, Questlet
@@ -64,8 +65,62 @@ class MultisetEvaluator(MultisetEvaluatorBase[T, U_co]):
             A hashable object indicating the next state.
             The special value `icepool.Reroll` can be used to immediately remove
             the state from consideration, effectively performing a full reroll.
+            Returning `icepool.Break(state)` ends the evaluation early with
+            the given final state, without seeing the remaining outcomes. As
+            with `map()`, `icepool.Break()` keeps the previous state.
         """
 
+    def next_state_batch(self, states: Mapping[Hashable, int], order: Order,
+                         outcome: T, /,
+                         *counts) -> Mapping[Hashable, int] | None:
+        """Optional method to apply `next_state()` to many states at once.
+
+        During evaluation, many states see the same outcome and counts. If the
+        transition is simple, e.g. shifting every state by the same amount,
+        overriding this avoids calling `next_state()` once per state.
+
+        Args:
+            states: Maps each previous state to its weight. If `next_state()`
+                can return `icepool.Break`, this may contain `Break`s, which
+                should be passed through unchanged.
+            order, outcome, *counts: As `next_state()`.
+
+        Returns:
+            A mapping from each next state to the total weight of the previous
+            states that transition to it, omitting states that would be
+            `icepool.Reroll`. This may be `states` itself if no state changes.
+            Alternatively, `None` to fall back to calling `next_state()` on
+            each state, which is the default.
+        """
+        return None
+
+    def canonicalize_state(self, state: Hashable, order: Order,
+                           remaining_outcomes: Sequence[T], /) -> Hashable:
+        """Optional method to merge states that will produce the same final outcome.
+
+        If overridden, this is called on each state produced by
+        `next_state()`. States that canonicalize to the same value are merged,
+        which can greatly reduce the number of states to track. For example,
+        once a run can no longer beat the best run found so far, the length of
+        the current run no longer matters.
+
+        The result may depend on `remaining_outcomes` but must not otherwise
+        depend on anything that `next_state_key` does not account for.
+        `state_counts()` can help find evaluations that would benefit from
+        this.
+
+        Args:
+            state: A state produced by `next_state()`.
+            order: The order in which outcomes are seen by `next_state()`.
+            remaining_outcomes: The outcomes that `next_state()` has yet to
+                see, in the order they will be seen.
+
+        Returns:
+            A state that is equivalent to `state` given the remaining
+            outcomes. The default implementation returns `state` unchanged.
+        """
+        return state
+
     def extra_outcomes(self, outcomes: Sequence[T]) -> Collection[T]:
         """Optional method to specify extra outcomes that should be seen as inputs to `next_state()`.
 
@@ -183,7 +238,8 @@ class MultisetEvaluator(MultisetEvaluatorBase[T, U_co]):
         caches if not inside a `@multiset_function`.
         
         If you do implement this, `next_state_key` should include any members 
-        used in `next_state()` but does NOT need to include members that are 
+        used in `next_state()` and `canonicalize_state()` but does NOT need to
+        include members that are 
         only used in other methods, i.e. 
         * `extra_outcomes()`
         * `initial_state()`
@@ -225,9 +281,15 @@ class MultisetEvaluator(MultisetEvaluatorBase[T, U_co]):
             else:
                 next_state_key = self.next_state_key
                 multiset_function_can_cache = True
+            canonicalize_state: Callable[..., Hashable] | None
+            if (type(self).canonicalize_state is
+                    MultisetEvaluator.canonicalize_state):
+                canonicalize_state = None
+            else:
+                canonicalize_state = self.canonicalize_state
             dungeon: MultisetEvaluatorDungeon[T] = MultisetEvaluatorDungeon(
-                self.next_state, next_state_key, multiset_function_can_cache,
-                dungeonlet_flats)
+                self.next_state, self.next_state_batch, canonicalize_state,
+                next_state_key, multiset_function_can_cache, dungeonlet_flats)
             quest: MultisetEvaluatorQuest[T, U_co] = MultisetEvaluatorQuest(
                 self.initial_state, self.extra_outcomes, self.final_outcome,
                 questlet_flats)
@@ -239,17 +301,142 @@ class MultisetEvaluator(MultisetEvaluatorBase[T, U_co]):
         return dungeon.__hash__ is not None
 
 
+class TransitionCacheInfo(NamedTuple):
+    """Statistics for a `next_state` decorated by `memoize_transitions`."""
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+@overload
+def memoize_transitions(
+        next_state: Callable[..., Hashable], /, *,
+        maxsize: int | None = None) -> Callable[..., Hashable]:
+    ...
+
+
+@overload
+def memoize_transitions(
+    next_state: None = None,
+    /,
+    *,
+    maxsize: int | None = None
+) -> Callable[[Callable[..., Hashable]], Callable[..., Hashable]]:
+    ...
+
+
+def memoize_transitions(
+    next_state: Callable[..., Hashable] | None = None,
+    /,
+    *,
+    maxsize: int | None = None
+) -> 'Callable[..., Hashable] | Callable[[Callable[..., Hashable]], Callable[..., Hashable]]':
+    """Decorator that memoizes a `MultisetEvaluator.next_state()` method.
+
+    Each distinct `(state, order, outcome, *counts)` is only computed once.
+    The cache is shared between all instances of the evaluator with the same
+    `next_state_key`, and persists between calls to `evaluate()`. This is worth
+    it only if `next_state()` is expensive, since the engine already caches
+    whole evaluations where it can.
+
+    * If `next_state_key` is `None`, transitions are cached separately for each
+        evaluator instance. The instance is used as part of the key, so it
+        must be hashable, and the cache keeps a reference to it.
+    * If `next_state_key` is `NoCache`, transitions are not cached.
+
+    Example:
+    ```python
+    class MyEvaluator(MultisetEvaluator):
+        @memoize_transitions
+        def next_state(self, state, order, outcome, count):
+            ...
+
+    class MyBoundedEvaluator(MultisetEvaluator):
+        @memoize_transitions(maxsize=65536)
+        def next_state(self, state, order, outcome, count):
+            ...
+    ```
+
+    The decorated method has `cache_info()` and `cache_clear()` functions
+    analogous to `functools.lru_cache`.
+
+    Args:
+        maxsize: The maximum number of transitions to keep, after which the
+            least recently used are discarded. If `None` (the default), the
+            cache is unbounded and grows with every distinct transition until
+            `cache_clear()` is called.
+    """
+    if next_state is None:
+        return functools.partial(memoize_transitions, maxsize=maxsize)
+
+    cache: dict[Hashable, Hashable] = {}
+    hits = 0
+    misses = 0
+
+    @functools.wraps(next_state)
+    def wrapped(self, state, order, outcome, /, *counts):
+        nonlocal hits, misses
+        next_state_key = self.next_state_key
+        if next_state_key is icepool.NoCache:
+            return next_state(self, state, order, outcome, *counts)
+        if next_state_key is None:
+            next_state_key = self
+        key = (next_state_key, state, order, outcome, counts)
+        try:
+            result = cache[key]
+        except KeyError:
+            misses += 1
+            result = next_state(self, state, order, outcome, *counts)
+            if maxsize is None:
+                cache[key] = result
+            elif maxsize > 0:
+                if len(cache) >= maxsize:
+                    # Dicts preserve insertion order, so the first key is the
+                    # least recently used.
+                    del cache[next(iter(cache))]
+                cache[key] = result
+            return result
+        hits += 1
+        if maxsize is not None:
+            # Move to the end as the most recently used.
+            del cache[key]
+            cache[key] = result
+        return result
+
+    def cache_info() -> TransitionCacheInfo:
+        """Hits and misses across all instances, and the size of the cache."""
+        return TransitionCacheInfo(hits, misses, maxsize, len(cache))
+
+    def cache_clear() -> None:
+        """Clears the cache and statistics."""
+        nonlocal hits, misses
+        cache.clear()
+        hits = 0
+        misses = 0
+
+    wrapped.cache_info = cache_info  # type: ignore
+    wrapped.cache_clear = cache_clear  # type: ignore
+    return wrapped
+
+
 class MultisetEvaluatorDungeon(Dungeon[T]):
     calls = ()
 
     # Will be filled in by constructor.
     next_state_main = None  # type: ignore
+    next_state_main_batch = None  # type: ignore
 
     def __init__(
             self, next_state_main: Callable[..., Hashable],
+            next_state_main_batch: Callable[..., Mapping[Hashable, int]
+                                            | None],
+            canonicalize_state_main: Callable[..., Hashable] | None,
             next_state_key: Hashable, multiset_function_can_cache: bool,
             dungeonlet_flats: 'tuple[tuple[Dungeonlet[T, Any], ...], ...]'):
         self.next_state_main = next_state_main  # type: ignore
+        self.next_state_main_batch = next_state_main_batch  # type: ignore
+        self.canonicalize_state_main = canonicalize_state_main
         self.next_state_key = next_state_key
         self._multiset_function_can_cache = multiset_function_can_cache
         self.dungeonlet_flats = dungeonlet_flats
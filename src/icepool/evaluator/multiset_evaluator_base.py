@@ -7,14 +7,14 @@ from icepool.function import sorted_union
 from icepool.order import ConflictingOrderError, Order, OrderReason, UnsupportedOrder, merge_order_preferences
 
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import Counter, defaultdict
 from functools import cached_property
 import itertools
 import math
 
 from icepool.typing import T, MaybeHashKeyed, U_co
-from typing import (Any, Collection, Generic, Hashable, Iterator, Mapping,
-                    MutableMapping, NamedTuple, Sequence, TYPE_CHECKING)
+from typing import (Any, Callable, Collection, Generic, Hashable, Iterator, Mapping,
+                    MutableMapping, NamedTuple, Sequence, cast, TYPE_CHECKING)
 
 if TYPE_CHECKING:
     from icepool.expression.multiset_expression_base import MultisetExpressionBase, MultisetSourceBase, Dungeonlet, Questlet
@@ -76,7 +76,8 @@ class MultisetEvaluatorBase(ABC, Generic[T, U_co]):
 
         # Convert arguments to expressions.
         input_exps = tuple(
-            icepool.implicit_convert_to_expression(arg) for arg in args)
+            icepool.implicit_convert_to_expression(arg)._optimize()
+            for arg in args)
 
         # In this case we are inside a @multiset_function.
         if any(exp._has_parameter for exp in input_exps):
@@ -108,6 +109,113 @@ class MultisetEvaluatorBase(ABC, Generic[T, U_co]):
 
     __call__ = evaluate
 
+    def state_counts(
+            self, *args: 'MultisetExpression[T] | Mapping[T, int] | Sequence[T]',
+            **kwargs: Hashable) -> list[int]:
+        """EXPERIMENTAL: Counts the states tracked at each step of an evaluation.
+
+        This is useful for diagnosing slow evaluations, e.g. whether
+        `canonicalize_state()` could merge states. The evaluation is run from
+        scratch, without using or populating the cache between calls to
+        `evaluate()`.
+
+        Args:
+            *args, **kwargs: As `evaluate()`.
+
+        Returns:
+            A list whose `k`th element is the number of states tracked after
+            `next_state()` has seen `k` outcomes, summed over the rooms of the
+            evaluation. Rooms are the combinations of remaining outcomes and
+            sources that the evaluation visits.
+        """
+        input_exps = tuple(
+            icepool.implicit_convert_to_expression(arg)._optimize()
+            for arg in args)
+
+        if any(exp._has_parameter for exp in input_exps):
+            raise TypeError(
+                'state_counts() cannot be used inside a @multiset_function.')
+
+        counts: MutableMapping[int, int] = defaultdict(int)
+        for dungeon, quest, sources, _ in self._prepare(input_exps, kwargs):
+            dungeon.room_state_counts = counts
+            dungeon.evaluate(quest, sources, kwargs)
+        return [counts[k] for k in range(max(counts, default=-1) + 1)]
+
+    def estimate(self,
+                 *args: 'MultisetExpression[T] | Mapping[T, int] | Sequence[T]',
+                 samples: int,
+                 rng=None,
+                 **kwargs: Hashable) -> 'icepool.Die[U_co]':
+        """EXPERIMENTAL: Estimates the result of `evaluate()` by random sampling.
+
+        This draws concrete multisets from the generators in the inputs and
+        runs the evaluation on each of them. This is useful when exact
+        evaluation is too expensive, e.g. large `MultiDeal`s.
+
+        The quantity of each outcome in the result is the number of samples
+        that produced that outcome. Samples that were rerolled are redrawn,
+        unless every sample of a branch of the evaluation was rerolled, in
+        which case that branch is dropped as it would be by `evaluate()`.
+        Therefore, results from independent runs, e.g. in separate processes
+        with differently seeded `rng`s, can be combined by adding their
+        quantities. The standard error of each estimated probability `p` is
+        `sqrt(p * (1 - p) / denominator)`.
+
+        Args:
+            *args: The input multisets, as `evaluate()`. All generators must
+                support sampling, e.g. `Pool`, `Deal`, and `MultiDeal`.
+            samples: The number of samples to draw.
+            rng: The source of randomness, as `Population.sample()`.
+                A `numpy.random.Generator` will draw each batch of rolls in a
+                vectorized fashion.
+            **kwargs: Non-multiset arguments, as `evaluate()`.
+
+        Raises:
+            NotImplementedError if an input does not support sampling.
+        """
+        if samples < 0:
+            raise ValueError('samples cannot be negative.')
+
+        input_exps = tuple(
+            icepool.implicit_convert_to_expression(arg)._optimize()
+            for arg in args)
+
+        if any(exp._has_parameter for exp in input_exps):
+            raise TypeError(
+                'estimate() cannot be used inside a @multiset_function.')
+
+        prepared = list(self._prepare(input_exps, kwargs))
+
+        # Decide how many samples each branch of the evaluation gets.
+        if len(prepared) == 1:
+            branch_samples = {0: samples}
+        else:
+            branch_die = icepool.Die(
+                {i: weight
+                 for i, (_, _, _, weight) in enumerate(prepared)})
+            branch_samples = Counter(branch_die.sample(samples, rng=rng))
+
+        final_data: 'MutableMapping[Any, int]' = defaultdict(int)
+        for i, n in branch_samples.items():
+            dungeon, quest, sources, _ = prepared[i]
+            # Rerolled samples are redrawn within the same branch, so that
+            # each branch keeps its share of the samples regardless of its
+            # reroll rate.
+            first = True
+            while n > 0:
+                outcomes = dungeon.sample_final_outcomes(
+                    quest, sources, n, rng, kwargs)
+                if first and not outcomes:
+                    # Assume this branch always rerolls.
+                    break
+                first = False
+                for outcome in outcomes:
+                    final_data[outcome] += 1
+                n -= len(outcomes)
+
+        return icepool.Die(final_data)
+
 
 class Dungeon(Generic[T], MaybeHashKeyed):
     """Holds an evaluation's next_state function and caches."""
@@ -129,12 +237,32 @@ class Dungeon(Generic[T], MaybeHashKeyed):
 
     _multiset_function_can_cache: bool
 
+    canonicalize_state_main: 'Callable[[Hashable, Order, tuple[T, ...]], Hashable] | None' = None
+    """Optional function `(state, order, remaining_outcomes) -> state` that merges equivalent states.
+
+    This is applied to states after each transition. `remaining_outcomes` are
+    the outcomes yet to be seen, in the order they will be seen.
+    """
+
+    room_state_counts: 'MutableMapping[int, int] | None' = None
+    """If set, the number of states in each room computed is added here.
+
+    This is keyed by the number of outcomes that have been seen by
+    `next_state_main` in that room.
+    """
+
     @cached_property
     def dungeonlet_call_tree(self) -> 'DungeonletCallTree[T]':
         dungeonlet_calls = tuple(call.dungeonlet_call_tree
                                  for call in self.calls)
         return DungeonletCallTree(self.dungeonlet_flats, dungeonlet_calls)
 
+    @cached_property
+    def next_state_tree(
+            self) -> 'Callable[..., tuple[StateletCallTree, tuple]]':
+        """The compiled `dungeonlet_call_tree.next_state`."""
+        return self.dungeonlet_call_tree.compile()
+
     @abstractmethod
     def next_state_main(self, state: Hashable, order: Order, outcome: T,
                         *arg_tree) -> Hashable:
@@ -151,8 +279,26 @@ class Dungeon(Generic[T], MaybeHashKeyed):
                 to the sub-calls.
 
         Returns:
-            The next state, or icepool.Reroll to drop this branch of evaluation.
+            The next state, icepool.Reroll to drop this branch of evaluation,
+            or icepool.Break to end this branch early.
+        """
+
+    def next_state_main_batch(
+            self, states: Mapping[Hashable, int], order: Order, outcome: T,
+            *arg_tree) -> Mapping[Hashable, int] | None:
+        """Optional batch version of `next_state_main()`.
+
+        Args:
+            states: Maps each state of the dungeon to its weight.
+            order, outcome, arg_tree: As `next_state_main()`.
+
+        Returns:
+            A mapping from each next state to the total weight of the states
+            that transition to it, omitting rerolled states; or `None` to
+            call `next_state_main()` on each state instead, which is the
+            default.
         """
+        return None
 
     def evaluate(self, quest: 'Quest[T, U_co]',
                  sources: 'tuple[MultisetSourceBase[T, Any], ...]',
@@ -174,6 +320,7 @@ class Dungeon(Generic[T], MaybeHashKeyed):
                                          for source in sources))
         extra_outcomes = quest.extra_outcomes(source_outcomes)
         all_outcomes = sorted_union(source_outcomes, extra_outcomes)
+        self._outcome_count = len(all_outcomes)
 
         try:
             room, arg_sizes = self.initial_room(quest, sources, -pop_order,
@@ -210,6 +357,98 @@ class Dungeon(Generic[T], MaybeHashKeyed):
                     f'Forwards evaluation could not be done because: {forwards_unsupported}'
                 )
 
+    def sample_final_outcomes(self, quest: 'Quest[T, U_co]',
+                              sources: 'tuple[MultisetSourceBase[T, Any], ...]',
+                              n: int, rng, kwargs: Mapping[str, Hashable]):
+        """Runs the evaluation on `n` random draws from the sources.
+
+        Returns:
+            A list of the final outcomes that were not rerolled.
+        """
+        if not all(source.is_resolvable() for source in sources):
+            return []
+
+        pop_order, pop_order_reason = merge_order_preferences(
+            (Order.Descending, OrderReason.Default),
+            *(source.order_preference() for source in sources))
+
+        source_outcomes = sorted_union(*(source.outcomes()
+                                         for source in sources))
+        extra_outcomes = quest.extra_outcomes(source_outcomes)
+        all_outcomes = sorted_union(source_outcomes, extra_outcomes)
+
+        source_samples = [
+            source.sample(n, rng, all_outcomes) for source in sources
+        ]
+
+        # Each sample is a single path, so either order works equally well
+        # as far as the sources are concerned.
+        try:
+            return self.walk_samples(quest, sources, source_samples,
+                                     -pop_order, all_outcomes, kwargs)
+        except UnsupportedOrder as backwards_unsupported:
+            try:
+                return self.walk_samples(quest, sources, source_samples,
+                                         pop_order, all_outcomes, kwargs)
+            except UnsupportedOrder as forwards_unsupported:
+                raise ConflictingOrderError(
+                    'Neither ascending nor descending order is compatable with the evaluation.\n'
+                    +
+                    f'{(-pop_order).name} order could not be used because: {backwards_unsupported}\n'
+                    +
+                    f'{pop_order.name} order could not be used because: {forwards_unsupported}'
+                )
+
+    def walk_samples(self, quest: 'Quest[T, U_co]',
+                     sources: 'tuple[MultisetSourceBase[T, Any], ...]',
+                     source_samples: Sequence[Sequence[tuple]], order: Order,
+                     outcomes: tuple[T, ...],
+                     kwargs: Mapping[str, Hashable]) -> list:
+        """Runs `next_state` over each sample in the given order.
+
+        Args:
+            source_samples: For each source, a sequence of samples, each of
+                which has a count for each of `outcomes`.
+        """
+        source_sizes = (source.size() for source in sources)
+        initial_statelet_tree, arg_sizes = quest.questlet_call_tree.initial_state(
+            order, outcomes, source_sizes, ())
+        initial_state_main = quest.initial_state_main(order, outcomes,
+                                                      *arg_sizes, **kwargs)
+        if order > 0:
+            indexes: Sequence[int] = range(len(outcomes))
+        else:
+            indexes = range(len(outcomes) - 1, -1, -1)
+
+        result = []
+        for sample in zip(*source_samples):
+            statelet_tree = initial_statelet_tree
+            state_main = initial_state_main
+            for i in indexes:
+                outcome = outcomes[i]
+                statelet_tree, count_tree = self.next_state_tree(
+                    statelet_tree, order, outcome,
+                    (counts[i] for counts in sample), ())
+                next_state_main = self.next_state_main(state_main, order,
+                                                       outcome, *count_tree)
+                if type(next_state_main) is icepool.Break:
+                    state_main = resolve_break(next_state_main, state_main)
+                    break
+                state_main = next_state_main
+                if state_main in icepool.REROLL_TYPES:
+                    break
+            if state_main not in icepool.REROLL_TYPES:
+                outcome = quest.final_outcome(state_main, order, outcomes,
+                                              *arg_sizes, **kwargs)
+                if outcome is None:
+                    raise TypeError(
+                        "None is not a valid final outcome.\n"
+                        "This may have been a result of not supplying any input with an outcome."
+                    )
+                if outcome not in icepool.REROLL_TYPES:
+                    result.append(outcome)
+        return result
+
     def initial_room(
             self, quest: 'Quest[T, U_co]',
             sources: 'tuple[MultisetSourceBase, ...]', order: Order,
@@ -224,7 +463,10 @@ class Dungeon(Generic[T], MaybeHashKeyed):
                     initial_state_main), arg_sizes
 
     def evaluate_backward(
-            self, pop_order: Order, room: 'Room'
+        self,
+        pop_order: Order,
+        room: 'Room',
+        later_outcomes: tuple[T, ...] = ()
     ) -> Mapping['StateletCallTree', Mapping[Hashable, int]]:
         """Internal algorithm for iterating so that next_state sees outcomes in backwards order.
 
@@ -236,6 +478,9 @@ class Dungeon(Generic[T], MaybeHashKeyed):
                 popped of this.
             inputs: One or more `MultisetExpression`s to evaluate. Elements
                 will be popped off this during recursion.
+            later_outcomes: The outcomes that will be seen after those of
+                the room, in the order they will be seen. This is only used
+                by `canonicalize_state_main`.
 
         Returns:
             A dict `{ state : weight }` describing the probability distribution
@@ -248,35 +493,81 @@ class Dungeon(Generic[T], MaybeHashKeyed):
         else:
             cache = self.ascending_cache
 
-        if room in cache:
-            return cache[room]
+        # Canonical states depend on the later outcomes, which are not part
+        # of the room.
+        cache_key: Hashable
+        if self.canonicalize_state_main is None:
+            cache_key = room
+        else:
+            cache_key = room, later_outcomes
+
+        if cache_key in cache:
+            return cache[cache_key]
 
         result: MutableMapping['StateletCallTree', MutableMapping[
             Hashable, int]] = defaultdict(lambda: defaultdict(int))
 
+        eval_order = -pop_order
         if room.is_done():
             result = {room.initial_statelet_tree: {room.initial_state_main: 1}}
         else:
-            eval_order = -pop_order
             for outcome, source_counts, prev_outcomes, prev_sources, weight in room.pop(
                     pop_order):
                 prev_room = Room(prev_outcomes, prev_sources,
                                  room.initial_statelet_tree,
                                  room.initial_state_main)
-                prev = self.evaluate_backward(pop_order, prev_room)
+                prev = self.evaluate_backward(pop_order, prev_room,
+                                              (outcome, ) + later_outcomes)
 
                 for prev_statelet_tree, prev_main in prev.items():
                     source_counts_iter = iter(source_counts)
-                    statelet_tree, count_tree = self.dungeonlet_call_tree.next_state(
+                    statelet_tree, count_tree = self.next_state_tree(
                         prev_statelet_tree, eval_order, outcome,
                         source_counts_iter, ())
                     subresult = result[statelet_tree]
+                    batch = self.next_state_main_batch(
+                        prev_main, eval_order, outcome, *count_tree)
+                    if batch is not None:
+                        for state_main, batch_weight in batch.items():
+                            subresult[state_main] += batch_weight * weight
+                        continue
                     for prev_state_main, prev_weight in prev_main.items():
+                        if type(prev_state_main) is icepool.Break:
+                            # This state has already finished.
+                            subresult[prev_state_main] += prev_weight * weight
+                            continue
                         state_main = self.next_state_main(
                             prev_state_main, eval_order, outcome, *count_tree)
-                        if state_main not in icepool.REROLL_TYPES:
-                            subresult[state_main] += prev_weight * weight
-        cache[room] = result
+                        if type(state_main) is icepool.Break:
+                            # Keep the Break so later outcomes skip this state.
+                            if state_main.outcome is None:
+                                state_main = icepool.Break(prev_state_main)
+                        elif state_main in icepool.REROLL_TYPES:
+                            continue
+                        subresult[state_main] += prev_weight * weight
+            if self.canonicalize_state_main is not None:
+                result = {
+                    statelet_tree:
+                    self._canonicalize_states(main, eval_order,
+                                              later_outcomes)
+                    for statelet_tree, main in result.items()
+                }
+        if self.room_state_counts is not None:
+            self.room_state_counts[len(room.outcomes)] += sum(
+                len(main) for main in result.values())
+        cache[cache_key] = result
+        return result
+
+    def _canonicalize_states(
+            self, states: Mapping[Hashable, int], order: Order,
+            remaining_outcomes: tuple[T, ...]) -> Mapping[Hashable, int]:
+        """Merges states that are equivalent according to `canonicalize_state_main`."""
+        canonicalize = cast(Callable, self.canonicalize_state_main)
+        result: MutableMapping[Hashable, int] = defaultdict(int)
+        for state, weight in states.items():
+            if type(state) is not icepool.Break:
+                state = canonicalize(state, order, remaining_outcomes)
+            result[state] += weight
         return result
 
     def evaluate_forward(
@@ -305,6 +596,10 @@ class Dungeon(Generic[T], MaybeHashKeyed):
         if room in cache:
             return cache[room]
 
+        if self.room_state_counts is not None:
+            self.room_state_counts[self._outcome_count -
+                                   len(room.outcomes)] += 1
+
         result: MutableMapping['StateletCallTree', MutableMapping[
             Hashable, int]] = defaultdict(lambda: defaultdict(int))
 
@@ -314,13 +609,27 @@ class Dungeon(Generic[T], MaybeHashKeyed):
             for outcome, source_counts, next_outcomes, next_sources, weight in room.pop(
                     pop_order):
                 source_counts_iter = iter(source_counts)
-                next_statelet_tree, count_tree = self.dungeonlet_call_tree.next_state(
+                next_statelet_tree, count_tree = self.next_state_tree(
                     room.initial_statelet_tree, pop_order, outcome,
                     source_counts_iter, ())
                 next_state_main = self.next_state_main(room.initial_state_main,
                                                        pop_order, outcome,
                                                        *count_tree)
-                if next_state_main not in icepool.REROLL_TYPES:
+                if type(next_state_main) is icepool.Break:
+                    # The remaining outcomes don't affect the final state, so
+                    # they only contribute their total weight.
+                    final_state_main = resolve_break(next_state_main,
+                                                     room.initial_state_main)
+                    remaining_weight = math.prod(
+                        source.denominator() for source in next_sources)
+                    result[next_statelet_tree][
+                        final_state_main] += weight * remaining_weight
+                elif next_state_main not in icepool.REROLL_TYPES:
+                    if self.canonicalize_state_main is not None:
+                        remaining_outcomes = (next_outcomes if pop_order > 0
+                                              else next_outcomes[::-1])
+                        next_state_main = self.canonicalize_state_main(
+                            next_state_main, pop_order, remaining_outcomes)
                     next_room = Room(next_outcomes, next_sources,
                                      next_statelet_tree, next_state_main)
                     final = self.evaluate_forward(pop_order, next_room)
@@ -426,6 +735,8 @@ class Quest(Generic[T, U_co]):
         final_weights = []
         for _, main_states in final_states.items():
             for state, weight in main_states.items():
+                if type(state) is icepool.Break:
+                    state = state.outcome
                 outcome = self.final_outcome(state, order, outcomes,
                                              *arg_sizes, **kwargs)
                 if outcome is None:
@@ -438,3 +749,10 @@ class Quest(Generic[T, U_co]):
                     final_weights.append(weight)
 
         return icepool.Die(final_outcomes, final_weights)
+
+
+def resolve_break(state: 'icepool.Break', prev_state: Hashable) -> Hashable:
+    """The final state indicated by a `Break` returned from `next_state`."""
+    if state.outcome is None:
+        return prev_state
+    return state.outcome
@@ -3,7 +3,7 @@ __docformat__ = 'google'
 import itertools
 import math
 import icepool
-from icepool.evaluator.multiset_evaluator_base import MultisetEvaluatorBase, Dungeon, Quest
+from icepool.evaluator.multiset_evaluator_base import MultisetEvaluatorBase, Dungeon, Quest, resolve_break
 from icepool.expression.multiset_expression_base import Dungeonlet, MultisetExpressionBase, Questlet, MultisetSourceBase
 from icepool.expression.multiset_parameter import MultisetParameter, MultisetTupleParameter
 
@@ -307,6 +307,7 @@ class MultisetFunctionDungeon(Dungeon[T]):
         self.dungeonlet_flats = dungeonlet_flats
         self.inner_dungeon = inner_dungeon
         self.calls = (inner_dungeon, )
+        self.canonicalize_state_main = inner_dungeon.canonicalize_state_main
 
         if self.inner_dungeon.__hash__ is None:
             self.__hash__ = None  # type: ignore
@@ -400,6 +401,9 @@ class MultisetFunctionJointDungeon(Dungeon[T]):
         self.dungeonlet_flats = dungeonlet_flats
         self.inner_dungeons = inner_dungeons
         self.calls = inner_dungeons
+        if any(dungeon.canonicalize_state_main is not None
+               for dungeon in inner_dungeons):
+            self.canonicalize_state_main = self._canonicalize_joint_state
 
         if any(dungeon.__hash__ is None for dungeon in inner_dungeons):
             self.__hash__ = None  # type: ignore
@@ -414,13 +418,32 @@ class MultisetFunctionJointDungeon(Dungeon[T]):
         inner_arg_tree: tuple
         for inner_state, inner_dungeon, inner_arg_tree in zip(
                 state, self.inner_dungeons, arg_counts):
+            if type(inner_state) is icepool.Break:
+                # This inner evaluation has already finished.
+                next_state.append(inner_state)
+                continue
             next_inner_state = inner_dungeon.next_state_main(
                 inner_state, order, outcome, *inner_arg_tree)
-            if next_inner_state in icepool.REROLL_TYPES:
+            if type(next_inner_state) is icepool.Break:
+                next_inner_state = icepool.Break(
+                    resolve_break(next_inner_state, inner_state))
+            elif next_inner_state in icepool.REROLL_TYPES:
                 return icepool.Restart
             next_state.append(next_inner_state)
+        if all(type(inner_state) is icepool.Break for inner_state in next_state):
+            return icepool.Break(
+                tuple(inner_state.outcome for inner_state in next_state))
         return tuple(next_state)
 
+    def _canonicalize_joint_state(self, state, order: Order,
+                                  remaining_outcomes: tuple[T, ...]):
+        return tuple(
+            inner_state if type(inner_state) is icepool.Break
+            or inner_dungeon.canonicalize_state_main is None else
+            inner_dungeon.canonicalize_state_main(inner_state, order,
+                                                  remaining_outcomes)
+            for inner_state, inner_dungeon in zip(state, self.inner_dungeons))
+
     @property
     def hash_key(self):
         if self.__hash__ is None or any(dungeon.hash_key is None
@@ -458,6 +481,9 @@ class MultisetFunctionJointQuest(Quest[T, Any]):
     def final_outcome(self, final_state, order: Order, outcomes: tuple[T, ...],
                       *arg_sizes, **kwargs: Hashable):
         # The kwargs have already been bound to inner_kwargses.
+        final_state = tuple(
+            inner_state.outcome if type(inner_state) is icepool.Break else
+            inner_state for inner_state in final_state)
         result = icepool.tupleize(*(quest.final_outcome(
             inner_main_state, order, outcomes, *inner_arg_sizes, **inner_kwargs
         ) for quest, inner_main_state, inner_arg_sizes, inner_kwargs in zip(
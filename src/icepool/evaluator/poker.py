@@ -6,6 +6,8 @@ from icepool.evaluator.multiset_evaluator import MultisetEvaluator
 
 import operator
 
+from collections import defaultdict
+
 from typing import Any, Callable, Collection, Final, Literal, Sequence
 
 
@@ -103,6 +105,19 @@ class LargestCountEvaluator(MultisetEvaluator[Any, int]):
         """Implementation."""
         return max(state or count, count)
 
+    def next_state_batch(self, states, order, outcome, count):
+        """Implementation."""
+        if None in states:
+            return None
+        # States at least as large as count are unchanged; the rest merge.
+        result: defaultdict[Any, int] = defaultdict(int)
+        for state, weight in states.items():
+            if state >= count:
+                result[state] += weight
+            else:
+                result[count] += weight
+        return result
+
     @property
     def next_state_key(self):
         return type(self)
@@ -211,6 +226,13 @@ class LargestStraightEvaluator(MultisetEvaluator[int, int]):
             run = 0
         return max(best_run, run), run
 
+    def canonicalize_state(self, state, order, remaining_outcomes):
+        best_run, run = state
+        if run + len(remaining_outcomes) <= best_run:
+            # The current run can no longer become the best run.
+            return best_run, 0
+        return state
+
     def final_outcome(  # type: ignore
             self, final_state, order, outcomes, size) -> int:
         if final_state is None:
@@ -361,10 +361,12 @@ class MultisetExpression(MultisetExpressionBase[T, int],
         return icepool.operator.MultisetSymmetricDifference(
             self, implicit_convert_to_expression(other))
 
-    def keep_outcomes(
-            self, outcomes:
-        'Callable[[T], bool] | Collection[T] | MultisetExpression[T]',
-            /) -> 'MultisetExpression[T]':
+    def keep_outcomes(self,
+                      outcomes:
+                      'Callable[[T], bool] | Collection[T] | MultisetExpression[T]',
+                      /,
+                      *,
+                      collapse: bool = False) -> 'MultisetExpression[T]':
         """Keeps the designated outcomes, and drops the rest by setting their counts to zero.
 
         This is similar to `intersection()`, except the right side is considered
@@ -373,18 +375,35 @@ class MultisetExpression(MultisetExpressionBase[T, int],
         Args:
             outcomes: A callable returning `True` iff the outcome should be kept,
                 or an expression or collection of outcomes to keep.
+            collapse: If set and this is applied directly to a pool or deal,
+                the dropped outcomes of the pool or deal are merged into at
+                most two outcomes so that fewer outcomes need to be evaluated.
+                This changes the `outcomes` seen by the evaluator, so it
+                should only be used if the evaluation depends only on the
+                counts of the kept outcomes. Not supported if `outcomes` is
+                an expression.
+
+        Raises:
+            TypeError: If `collapse` is set and `outcomes` is an expression.
         """
         if isinstance(outcomes, MultisetExpression):
+            if collapse:
+                raise TypeError(
+                    'collapse is not supported if outcomes is an expression.'
+                )
             return icepool.operator.MultisetFilterOutcomesBinary(
                 self, outcomes)
         else:
             return icepool.operator.MultisetFilterOutcomes(self,
-                                                           outcomes=outcomes)
-
-    def drop_outcomes(
-            self, outcomes:
-        'Callable[[T], bool] | Collection[T] | MultisetExpression[T]',
-            /) -> 'MultisetExpression[T]':
+                                                           outcomes=outcomes,
+                                                           collapse=collapse)
+
+    def drop_outcomes(self,
+                      outcomes:
+                      'Callable[[T], bool] | Collection[T] | MultisetExpression[T]',
+                      /,
+                      *,
+                      collapse: bool = False) -> 'MultisetExpression[T]':
         """Drops the designated outcomes by setting their counts to zero, and keeps the rest.
 
         This is similar to `difference()`, except the right side is considered
@@ -393,15 +412,24 @@ class MultisetExpression(MultisetExpressionBase[T, int],
         Args:
             outcomes: A callable returning `True` iff the outcome should be
                 dropped, or an expression or collection of outcomes to drop.
+            collapse: As `keep_outcomes()`.
+
+        Raises:
+            TypeError: If `collapse` is set and `outcomes` is an expression.
         """
         if isinstance(outcomes, MultisetExpression):
+            if collapse:
+                raise TypeError(
+                    'collapse is not supported if outcomes is an expression.'
+                )
             return icepool.operator.MultisetFilterOutcomesBinary(self,
                                                                  outcomes,
                                                                  invert=True)
         else:
             return icepool.operator.MultisetFilterOutcomes(self,
                                                            outcomes=outcomes,
-                                                           invert=True)
+                                                           invert=True,
+                                                           collapse=collapse)
 
     # Adjust counts.
 
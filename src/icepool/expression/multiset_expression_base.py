@@ -58,10 +58,27 @@ class MultisetExpressionBase(Generic[T, Q], MaybeHashKeyed):
     def _static_keepable(self) -> bool:
         """Whether this expression supports keep operations via static analysis."""
 
+    def _optimize(self) -> 'MultisetExpressionBase[T, Q]':
+        """Rewrites this expression into an equivalent one that is cheaper to evaluate.
+
+        This is applied to the inputs of an evaluation before `_prepare()`.
+        Equivalent expressions should be rewritten to the same form where
+        practical so that they share a `hash_key`.
+
+        Defaults to `self`.
+        """
+        return self
+
 
 class Dungeonlet(Generic[T, Q], MaybeHashKeyed):
     child_indexes: tuple[int, ...]
     """The relative (therefore negative) indexes of this node's children."""
+    stateless: bool = False
+    """Whether the local state is always `None`.
+
+    Stateless dungeonlets are omitted from statelet trees and are always
+    given `None` as their state.
+    """
 
     @abstractmethod
     def next_state(self, state: Hashable, order: Order, outcome: T,
@@ -92,11 +109,15 @@ class BodyDungeonlet(Dungeonlet[T, Q]):
     # Will be filled in by the constructor.
     next_state = None  # type: ignore
 
-    def __init__(self, next_state: Callable, hash_key: Hashable,
-                 child_indexes: tuple[int, ...]):
+    def __init__(self,
+                 next_state: Callable,
+                 hash_key: Hashable,
+                 child_indexes: tuple[int, ...],
+                 stateless: bool = False):
         self.next_state = next_state  # type: ignore
         self._hash_key = (hash_key, child_indexes)
         self.child_indexes = child_indexes
+        self.stateless = stateless
 
     @property
     def hash_key(self):
@@ -106,6 +127,7 @@ class BodyDungeonlet(Dungeonlet[T, Q]):
 class MultisetFreeVariable(Dungeonlet[T, Q]):
     """A dungeonlet left behind in place of a freed source."""
     child_indexes = ()
+    stateless = True
 
     def next_state(self, state, order, outcome, child_counts, source_counts,
                    arg_counts):
@@ -159,6 +181,40 @@ class MultisetSourceBase(Generic[T, Q], MaybeHashKeyed):
     def is_resolvable(self) -> bool:
         """Whether this source contains any probability."""
 
+    def denominator(self) -> int:
+        """The total weight of all multisets this source can produce.
+
+        The default implementation sums over every way of popping all
+        outcomes, so subclasses should override this if they can compute it
+        directly.
+        """
+        outcomes = self.outcomes()
+        if not outcomes:
+            return 1
+        return sum(
+            popped.denominator() * weight
+            for popped, _, weight in self.pop(Order.Ascending, outcomes[0]))
+
+    def sample(self, n: int, rng,
+               outcomes: Sequence[T]) -> list[tuple[Q, ...]]:
+        """Optional: Draws random multisets from this source.
+
+        Args:
+            n: The number of multisets to draw.
+            rng: The source of randomness, as `Population.sample()`.
+            outcomes: The outcomes to report counts for in ascending order.
+                This includes all of `self.outcomes()`.
+
+        Returns:
+            A list of `n` tuples, each of which contains the count of each of
+            `outcomes`.
+
+        Raises:
+            NotImplementedError if this source does not support sampling.
+        """
+        raise NotImplementedError(
+            f'{type(self).__name__} does not support sampling.')
+
     def min_outcome(self) -> T:
         return self.outcomes()[0]
 
@@ -169,6 +225,11 @@ class MultisetSourceBase(Generic[T, Q], MaybeHashKeyed):
 class Questlet(Generic[T, Q]):
     child_indexes: tuple[int, ...]
     """The relative (therefore negative) indexes of this node's children."""
+    stateless: bool = False
+    """Whether the initial state is always `None`.
+
+    This must match the corresponding dungeonlet.
+    """
 
     @abstractmethod
     def initial_state(self, order: Order, outcomes: Sequence[T],
@@ -198,10 +259,13 @@ class BodyQuestlet(Questlet[T, Q]):
     # Will be filled in by the constructor.
     initial_state = None  # type: ignore
 
-    def __init__(self, initial_state: Callable, child_indexes: tuple[int,
-                                                                     ...]):
+    def __init__(self,
+                 initial_state: Callable,
+                 child_indexes: tuple[int, ...],
+                 stateless: bool = False):
         self.initial_state = initial_state  # type: ignore
         self.child_indexes = child_indexes
+        self.stateless = stateless
 
 
 class DungeonletCallTree(Generic[T], NamedTuple):
@@ -229,14 +293,20 @@ class DungeonletCallTree(Generic[T], NamedTuple):
         next_flats = []
         output_counts: MutableSequence = []
         for dungeonlets, statelets in zip(self.flats, statelet_tree.flats):
+            statelet_iter = iter(statelets)
             next_statelets = []
             countlets: MutableSequence = []
-            for dungeonlet, statelet in zip(dungeonlets, statelets):
+            for dungeonlet in dungeonlets:
+                if dungeonlet.stateless:
+                    statelet = None
+                else:
+                    statelet = next(statelet_iter)
                 child_counts = [countlets[i] for i in dungeonlet.child_indexes]
                 next_statelet, countlet = dungeonlet.next_state(
                     statelet, order, outcome, child_counts, source_counts,
                     arg_counts)
-                next_statelets.append(next_statelet)
+                if not dungeonlet.stateless:
+                    next_statelets.append(next_statelet)
                 countlets.append(countlet)
             next_flats.append(tuple(next_statelets))
             output_counts.append(countlets[-1])
@@ -258,6 +328,149 @@ class DungeonletCallTree(Generic[T], NamedTuple):
             count_tree = tuple(output_counts)
         return next_statelet_tree, count_tree
 
+    def compile(self) -> Callable[..., 'tuple[StateletCallTree, tuple]']:
+        """Fuses this call tree into a single function equivalent to `next_state`.
+
+        `next_state` walks the flats on every transition, gathering
+        `child_counts` into fresh lists. The compiled function instead unrolls
+        the whole tree, including calls, into straight-line code, with each
+        statelet and count held in a local variable and the child indexes
+        resolved ahead of time. Stateless dungeonlets are given a constant
+        `None` state.
+
+        Common subexpressions are also eliminated: a stateless dungeonlet with
+        the same `hash_key` and the same inputs as an earlier one reuses that
+        count rather than being run again, even if the two are in different
+        calls, e.g. `a & b` in `return (a & b).size(), (a & b).sum()`.
+        """
+        namespace: dict[str, Any] = {'StateletCallTree': StateletCallTree}
+        lines: list[str] = []
+        statelet_source, count_source = self._compile_into(
+            lines, namespace, {}, 'statelet_tree', 'arg_counts', '')
+        lines.append(f'return {statelet_source}, {count_source}')
+        source = (
+            'def next_state(statelet_tree, order, outcome, source_counts, '
+            'arg_counts):\n' + ''.join(f'    {line}\n' for line in lines))
+        exec(source, namespace)
+        return namespace['next_state']
+
+    def _compile_into(self, lines: list[str], namespace: dict[str, Any],
+                      values: dict[Hashable, str], statelet_tree_name: str,
+                      arg_counts_name: str, prefix: str) -> tuple[str, str]:
+        """Appends the source lines computing this call tree.
+
+        Args:
+            lines: Source lines will be appended to this.
+            namespace: The globals of the compiled function. Dungeonlet
+                functions will be added to this.
+            values: Maps the key of each count computed so far to the name of
+                the local variable holding it.
+            statelet_tree_name: The name of the local variable holding the
+                previous statelet tree.
+            arg_counts_name: The name of the local variable holding the
+                arg counts.
+            prefix: Prepended to all names generated by this call tree.
+
+        Returns:
+            Source expressions for the next statelet tree and the count tree.
+        """
+        start = len(lines)
+        flat_state_names = []
+        output_names = []
+        for i, dungeonlets in enumerate(self.flats):
+            state_names = [
+                f'{prefix}s{i}_{j}' for j, dungeonlet in enumerate(dungeonlets)
+                if not dungeonlet.stateless
+            ]
+            flat_state_names.append(_tuple_source(state_names))
+            count_names: list[str] = []
+            for j, dungeonlet in enumerate(dungeonlets):
+                child_counts = tuple(count_names[j + k]
+                                     for k in dungeonlet.child_indexes)
+                key = _value_key(dungeonlet, child_counts, arg_counts_name)
+                if key is not None and key in values:
+                    count_names.append(values[key])
+                    continue
+                function_name = f'{prefix}f{i}_{j}'
+                state_name = f'{prefix}s{i}_{j}'
+                count_name = f'{prefix}c{i}_{j}'
+                namespace[function_name] = dungeonlet.next_state
+                arguments = (f'order, outcome, {_tuple_source(child_counts)}, '
+                             f'source_counts, {arg_counts_name}')
+                if dungeonlet.stateless:
+                    lines.append(f'_, {count_name} = '
+                                 f'{function_name}(None, {arguments})')
+                else:
+                    lines.append(f'{state_name}, {count_name} = '
+                                 f'{function_name}({state_name}, {arguments})')
+                if key is not None:
+                    values[key] = count_name
+                count_names.append(count_name)
+            output_names.append(count_names[-1])
+        stateful = any(not dungeonlet.stateless for dungeonlets in self.flats
+                       for dungeonlet in dungeonlets)
+        if stateful:
+            lines.insert(
+                start,
+                f'{_tuple_source(flat_state_names)} = {statelet_tree_name}.flats'
+            )
+            flats_source = _tuple_source(flat_state_names)
+        else:
+            flats_source = f'{statelet_tree_name}.flats'
+        if not self.calls:
+            if not stateful:
+                # Nothing to advance, so the statelet tree can be reused as-is.
+                return statelet_tree_name, _tuple_source(output_names)
+            return (f'StateletCallTree({flats_source}, ())',
+                    _tuple_source(output_names))
+        output_counts_name = f'{prefix}output_counts'
+        lines.append(
+            f'{output_counts_name} = {_tuple_source(output_names)}')
+        call_tree_names = [f'{prefix}t{i}' for i in range(len(self.calls))]
+        lines.append(
+            f'{_tuple_source(call_tree_names)} = {statelet_tree_name}.calls')
+        call_statelet_sources = []
+        call_count_sources = []
+        for i, call in enumerate(self.calls):
+            call_statelet_source, call_count_source = call._compile_into(
+                lines, namespace, values, call_tree_names[i],
+                output_counts_name, f'{prefix}k{i}_')
+            call_statelet_sources.append(call_statelet_source)
+            call_count_sources.append(call_count_source)
+        if not stateful and call_statelet_sources == call_tree_names:
+            return statelet_tree_name, _tuple_source(call_count_sources)
+        return (f'StateletCallTree({flats_source}, '
+                f'{_tuple_source(call_statelet_sources)})',
+                _tuple_source(call_count_sources))
+
+
+def _value_key(dungeonlet: Dungeonlet, child_counts: tuple[str, ...],
+               arg_counts_name: str) -> Hashable:
+    """Identifies the count produced by a dungeonlet for the purposes of common subexpression elimination.
+
+    Returns:
+        `None` if the count may not be shared with any other dungeonlet.
+    """
+    # Free variables are stateless, but each consumes a different source.
+    if not dungeonlet.stateless or isinstance(dungeonlet,
+                                              MultisetFreeVariable):
+        return None
+    key = (dungeonlet.hash_key, child_counts, arg_counts_name)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _tuple_source(names: Sequence[str]) -> str:
+    """Python source for a tuple display of the given expressions."""
+    if len(names) == 1:
+        return f'({names[0]},)'
+    if not names:
+        return '()'
+    return '(' + ', '.join(names) + ')'
+
 
 class StateletCallTree(NamedTuple):
     flats: 'tuple[tuple[Hashable, ...], ...]'
@@ -295,7 +508,8 @@ class QuestletCallTree(Generic[T], NamedTuple):
                 child_sizes = [countlets[i] for i in questlet.child_indexes]
                 next_statelet, countlet = questlet.initial_state(
                     order, outcomes, child_sizes, source_sizes, arg_sizes)
-                statelets.append(next_statelet)
+                if not questlet.stateless:
+                    statelets.append(next_statelet)
                 countlets.append(countlet)
             statelet_flats.append(tuple(statelets))
             output_sizes.append(countlets[-1])
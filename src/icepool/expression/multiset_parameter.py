@@ -69,6 +69,7 @@ class MultisetTupleParameter(MultisetParameterBase[T, IntTupleOut],
 
 class MultisetParameterDungeonlet(Dungeonlet[T, Q]):
     child_indexes = ()
+    stateless = True
 
     def __init__(self, arg_index: int, star_index: int | None):
         self.arg_index = arg_index
@@ -88,6 +89,7 @@ class MultisetParameterDungeonlet(Dungeonlet[T, Q]):
 
 class MultisetParameterQuestlet(Questlet[T, Q]):
     child_indexes = ()
+    stateless = True
 
     def __init__(self, index: int, star_index: int | None):
         self.arg_index = index
@@ -132,8 +132,12 @@ class MultisetTupleIndex(Generic[T, IntTupleIn], MultisetExpression[T]):
                 0]._prepare():
             child_indexes = (-1, )
             dungeonlet = BodyDungeonlet[T, int](self._next_state,
-                                                self.hash_key, child_indexes)
-            questlet = BodyQuestlet[T, int](self._initial_state, child_indexes)
+                                                self.hash_key,
+                                                child_indexes,
+                                                stateless=True)
+            questlet = BodyQuestlet[T, int](self._initial_state,
+                                            child_indexes,
+                                            stateless=True)
 
             yield dungeonlets + (dungeonlet, ), tuple(questlets) + (
                 questlet, ), tuple(sources), weight
@@ -183,9 +187,11 @@ class MultisetTupleSlice(Generic[T, IntTupleIn, IntTupleOut],
             child_indexes = (-1, )
             dungeonlet = BodyDungeonlet[T, IntTupleOut](self._next_state,
                                                         self.hash_key,
-                                                        child_indexes)
+                                                        child_indexes,
+                                                        stateless=True)
             questlet = BodyQuestlet[T, IntTupleOut](self._initial_state,
-                                                    child_indexes)
+                                                    child_indexes,
+                                                    stateless=True)
 
             yield dungeonlets + (dungeonlet, ), tuple(questlets) + (
                 questlet, ), tuple(sources), weight
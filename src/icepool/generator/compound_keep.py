@@ -8,7 +8,7 @@ from icepool.order import Order, OrderReason, merge_order_preferences
 import itertools
 import math
 
-from typing import Sequence
+from typing import Callable, Sequence, cast
 from icepool.typing import T
 
 
@@ -29,6 +29,12 @@ class CompoundKeepGenerator(KeepGenerator[T]):
                                                 ...]) -> 'KeepGenerator[T]':
         return CompoundKeepGenerator(self._inner_generators, keep_tuple)
 
+    def _map_outcomes(self, function: Callable[[T], T],
+                      /) -> 'KeepGenerator[T]':
+        return CompoundKeepGenerator(
+            [inner._map_outcomes(function) for inner in self._inner_generators],
+            self._keep_tuple)
+
     @property
     def hash_key(self):
         return CompoundKeepGenerator, self._inner_generators, self._keep_tuple
@@ -73,6 +79,21 @@ class CompoundKeepSource(KeepSource[T]):
     def is_resolvable(self) -> bool:
         return all(inner.is_resolvable() for inner in self.inner_sources)
 
+    def denominator(self) -> int:
+        return math.prod(inner.denominator() for inner in self.inner_sources)
+
+    def sample_raw(self, n: int, rng) -> list[tuple[T, ...]]:
+        rows: list[list[T]] = [[] for _ in range(n)]
+        for inner in self.inner_sources:
+            # Inner keep_tuples are non-negative, so each kept roll can be
+            # repeated in place.
+            inner_keep_tuple = cast(KeepSource, inner).keep_tuple
+            for row, raw in zip(rows,
+                                cast(KeepSource, inner).sample_raw(n, rng)):
+                for outcome, keep in zip(raw, inner_keep_tuple):
+                    row.extend([outcome] * keep)
+        return [tuple(sorted(row)) for row in rows]
+
     @property
     def hash_key(self):
         return CompoundKeepSource, self.inner_sources, self.keep_tuple
@@ -4,11 +4,14 @@ import icepool
 import icepool.math
 import icepool.order
 from icepool.generator.multiset_generator import MultisetGenerator
-from icepool.generator.keep import KeepGenerator, KeepSource, pop_max_from_keep_tuple, pop_min_from_keep_tuple
+from icepool.generator.keep import KeepGenerator, KeepSource, collapse_dropped_outcomes, pop_max_from_keep_tuple, pop_min_from_keep_tuple
 from icepool.collection.counts import CountsKeysView
 from icepool.order import Order, OrderReason
 
+from collections import defaultdict
+
 from icepool.typing import T
+from typing import Callable, MutableMapping
 
 
 class Deal(KeepGenerator[T]):
@@ -54,6 +57,21 @@ class Deal(KeepGenerator[T]):
     def _set_keep_tuple(self, keep_tuple: tuple[int, ...]) -> 'Deal[T]':
         return Deal._new_raw(self._deck, keep_tuple)
 
+    def _map_outcomes(self, function: Callable[[T], T], /) -> 'Deal[T]':
+        data: MutableMapping[T, int] = defaultdict(int)
+        for outcome, quantity in self._deck.items():
+            data[function(outcome)] += quantity
+        return Deal._new_raw(icepool.Deck(data), self._keep_tuple)
+
+    def _collapse_outcomes(self, keep: Callable[[T], bool], /) -> 'Deal[T]':
+        # Rank matters unless every card is counted the same.
+        if len(set(self._keep_tuple)) > 1:
+            return self
+        mapping = collapse_dropped_outcomes(self._deck.outcomes(), keep)
+        if mapping is None:
+            return self
+        return self._map_outcomes(mapping.__getitem__)
+
     def deck(self) -> 'icepool.Deck[T]':
         """The `Deck` the cards are dealt from."""
         return self._deck
@@ -163,3 +181,9 @@ class DealSource(KeepSource[T]):
 
     def is_resolvable(self) -> bool:
         return len(self.outcomes()) != 0
+
+    def sample_raw(self, n: int, rng) -> list[tuple[T, ...]]:
+        return [
+            tuple(sorted(hand))
+            for hand in self.deck._sample_draws(n, len(self.keep_tuple), rng)
+        ]
@@ -3,11 +3,13 @@ __docformat__ = 'google'
 import icepool
 from icepool.generator.multiset_generator import MultisetGenerator, MultisetSource
 
+import bisect
+
 from functools import cached_property
 
 from abc import abstractmethod
 from types import EllipsisType
-from typing import Literal, Mapping, Sequence, cast, overload, TYPE_CHECKING
+from typing import Callable, Literal, Mapping, Sequence, cast, overload, TYPE_CHECKING
 import icepool.expression.multiset_expression
 from icepool.typing import ImplicitConversionError, T
 
@@ -37,6 +39,15 @@ class KeepGenerator(MultisetGenerator[T]):
                                                 ...]) -> 'KeepGenerator[T]':
         """Produces a copy with a modified keep_tuple."""
 
+    @abstractmethod
+    def _map_outcomes(self, function: Callable[[T], T],
+                      /) -> 'KeepGenerator[T]':
+        """Produces a copy with each outcome replaced by `function(outcome)`.
+
+        The keep tuple is unchanged, so `function` must be non-decreasing
+        unless every element of the keep tuple is the same.
+        """
+
     @cached_property
     def _keep_size(self) -> int:
         return sum(self._keep_tuple)
@@ -57,10 +68,110 @@ class KeepGenerator(MultisetGenerator[T]):
         """Whether any element of the keep tuple is zero."""
         return any(x == 0 for x in self._keep_tuple)
 
+    @overload
+    def sample(self, n: None = None, /, *, rng=None) -> tuple[T, ...]:
+        ...
+
+    @overload
+    def sample(self, n: int, /, *, rng=None) -> list[tuple[T, ...]]:
+        ...
+
+    def sample(
+            self,
+            n: int | None = None,
+            /,
+            *,
+            rng=None) -> tuple[T, ...] | list[tuple[T, ...]]:
+        """Random rolls of this generator.
+
+        Each roll is a tuple of outcomes in ascending order. Each element is
+        repeated according to the `keep_tuple`, e.g. dropped elements do not
+        appear at all.
+
+        This is not cryptographically secure.
+
+        Args:
+            n: The number of rolls to draw. If not provided, a single roll is
+                returned; otherwise, a list of `n` rolls is returned.
+            rng: The source of randomness, as `Population.sample()`.
+                A `numpy.random.Generator` will draw all `n` rolls in a
+                vectorized fashion.
+
+        Raises:
+            ValueError: If the `keep_tuple` has negative elements.
+        """
+        if self.has_negative_keeps():
+            raise ValueError(
+                'Cannot sample a generator with negative keeps.')
+        if n is not None and n < 0:
+            raise ValueError('n cannot be negative.')
+        source = cast(KeepSource, self._make_source())
+        result = [
+            tuple(outcome for outcome, keep in zip(raw, self._keep_tuple)
+                  for _ in range(keep))
+            for raw in source.sample_raw(1 if n is None else n, rng)
+        ]
+        if n is None:
+            return result[0]
+        return result
+
     @property
     def _static_keepable(self) -> bool:
         return True
 
+    def _collapse_outcomes(self, keep: Callable[[T], bool],
+                           /) -> 'KeepGenerator[T]':
+        """Merges outcomes for which `keep` is `False`, leaving fewer outcomes to evaluate.
+
+        This is only valid if the counts of those outcomes will subsequently
+        be discarded.
+
+        Returns:
+            A generator that produces the same counts as this one for every
+            outcome for which `keep` is `True`. Defaults to `self`.
+        """
+        return self
+
+    def bucket(self, boundaries: Sequence[T], /) -> 'KeepGenerator[T]':
+        """Merges outcomes into bands, so that fewer outcomes need to be evaluated.
+
+        Each outcome is replaced by the greatest boundary that is less than or
+        equal to it. This is useful when only the band that each outcome falls
+        into matters, e.g. when counting successes against a few thresholds.
+        Since the replacement is order-preserving, this applies to any keep
+        tuple.
+
+        Example:
+        ```python
+        # Dice rolling 1-49, 50-89, and 90-100 are counted as 1, 50, and 90
+        # respectively.
+        d100.pool(5).bucket([1, 50, 90])
+        ```
+
+        Args:
+            boundaries: The lowest outcome of each band, in strictly ascending
+                order. Every outcome must be at least the first boundary.
+
+        Raises:
+            ValueError: If `boundaries` is empty or not strictly ascending, or
+                if an outcome is below the first boundary.
+        """
+        boundaries = tuple(boundaries)
+        if len(boundaries) == 0:
+            raise ValueError('bucket() requires at least one boundary.')
+        if any(a >= b for a, b in zip(boundaries[:-1], boundaries[1:])):
+            raise ValueError('Boundaries must be in strictly ascending order.')
+
+        def function(outcome: T) -> T:
+            index = bisect.bisect_right(boundaries, outcome) - 1
+            if index < 0:
+                raise ValueError(
+                    f'Outcome {outcome} is below the first boundary {boundaries[0]}.'
+                )
+            return boundaries[index]
+
+        return self._map_outcomes(function)
+
     @overload
     def keep(
             self,
@@ -269,6 +380,44 @@ class KeepGenerator(MultisetGenerator[T]):
         return -1 * self
 
 
+def collapse_dropped_outcomes(outcomes: Sequence[T],
+                              keep: Callable[[T], bool]) -> dict[T, T] | None:
+    """Maps outcomes for which `keep` is `False` onto at most two of them.
+
+    Dropped outcomes above the highest kept outcome are mapped to the highest
+    dropped outcome; all others are mapped to the lowest dropped outcome. So
+    unless all outcomes are dropped, the lowest and highest outcomes are
+    preserved.
+
+    Args:
+        outcomes: The outcomes in ascending order.
+        keep: Whether each outcome should be kept.
+
+    Returns:
+        A mapping from each outcome to its replacement, or `None` if this
+        would not merge any outcomes.
+    """
+    kept = [keep(outcome) for outcome in outcomes]
+    dropped = [outcome for outcome, k in zip(outcomes, kept) if not k]
+    if not dropped:
+        return None
+    if any(kept):
+        last_kept = max(i for i, k in enumerate(kept) if k)
+    else:
+        last_kept = -1
+    result = {}
+    for i, (outcome, k) in enumerate(zip(outcomes, kept)):
+        if k:
+            result[outcome] = outcome
+        elif i > last_kept:
+            result[outcome] = dropped[-1]
+        else:
+            result[outcome] = dropped[0]
+    if len(set(result.values())) == len(outcomes):
+        return None
+    return result
+
+
 def make_keep_tuple(
         pool_size: int,
         index: int | slice | Sequence[int | EllipsisType]) -> tuple[int, ...]:
@@ -375,3 +524,31 @@ class KeepSource(MultisetSource[T]):
         if any(x < 0 for x in self.keep_tuple):
             return None
         return sum(self.keep_tuple)
+
+    def sample_raw(self, n: int, rng) -> list[tuple[T, ...]]:
+        """Optional: Draws random rolls from this source before the keep_tuple is applied.
+
+        Args:
+            n: The number of multisets to draw.
+            rng: The source of randomness, as `Population.sample()`.
+
+        Returns:
+            A list of `n` tuples, each of which contains one outcome per
+            element of `keep_tuple` in ascending order.
+
+        Raises:
+            NotImplementedError if this source does not support sampling.
+        """
+        raise NotImplementedError(
+            f'{type(self).__name__} does not support sampling.')
+
+    def sample(self, n: int, rng,
+               outcomes: Sequence[T]) -> list[tuple[int, ...]]:
+        index = {outcome: i for i, outcome in enumerate(outcomes)}
+        result = []
+        for raw in self.sample_raw(n, rng):
+            counts = [0] * len(outcomes)
+            for outcome, keep in zip(raw, self.keep_tuple):
+                counts[index[outcome]] += keep
+            result.append(tuple(counts))
+        return result
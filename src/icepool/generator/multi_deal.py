@@ -13,7 +13,7 @@ from functools import cached_property
 
 from icepool.typing import T
 
-from typing import Hashable, Iterable, Iterator, cast
+from typing import Hashable, Iterable, Iterator, Sequence, cast, overload
 
 
 class MultiDeal(MultisetTupleGenerator[T, IntTupleOut]):
@@ -105,6 +105,55 @@ class MultiDeal(MultisetTupleGenerator[T, IntTupleOut]):
     def denominator(self) -> int:
         return self._denominator
 
+    @overload
+    def sample(self,
+               n: None = None,
+               /,
+               *,
+               rng=None) -> tuple[tuple[T, ...], ...]:
+        ...
+
+    @overload
+    def sample(self, n: int, /, *,
+               rng=None) -> list[tuple[tuple[T, ...], ...]]:
+        ...
+
+    def sample(
+        self,
+        n: int | None = None,
+        /,
+        *,
+        rng=None
+    ) -> tuple[tuple[T, ...], ...] | list[tuple[tuple[T, ...], ...]]:
+        """Random deals of this `MultiDeal`.
+
+        Each deal is a tuple with one element per hand. Each hand is a tuple of
+        cards in ascending order.
+
+        This is not cryptographically secure.
+
+        Args:
+            n: The number of deals to draw. If not provided, a single deal is
+                returned; otherwise, a list of `n` deals is returned.
+            rng: The source of randomness, as `Population.sample()`.
+                A `numpy.random.Generator` will draw all `n` deals in a
+                vectorized fashion.
+        """
+        if n is not None and n < 0:
+            raise ValueError('n cannot be negative.')
+        result = []
+        for cards in self.deck()._sample_draws(1 if n is None else n,
+                                               self.total_cards_dealt(), rng):
+            hands = []
+            pos = 0
+            for hand_size in self.hand_sizes():
+                hands.append(tuple(sorted(cards[pos:pos + hand_size])))
+                pos += hand_size
+            result.append(tuple(hands))
+        if n is None:
+            return result[0]
+        return result
+
     def _make_source(self) -> 'MultisetTupleSource[T, IntTupleOut]':
         return MultiDealSource(self._deck, self._hand_groups)
 
@@ -229,3 +278,21 @@ class MultiDealSource(MultisetTupleSource[T, IntTupleOut]):
 
     def is_resolvable(self) -> bool:
         return len(self.outcomes()) != 0
+
+    def sample(self, n: int, rng,
+               outcomes: Sequence[T]) -> list[tuple[IntTupleOut, ...]]:
+        index = {outcome: i for i, outcome in enumerate(outcomes)}
+        hand_sizes = self.hand_sizes()
+        result = []
+        for cards in self.deck._sample_draws(n, self.total_cards_dealt(),
+                                             rng):
+            counts = [[0] * len(hand_sizes) for _ in outcomes]
+            # Each hand takes the next hand_size cards drawn.
+            pos = 0
+            for hand_index, hand_size in enumerate(hand_sizes):
+                for card in cards[pos:pos + hand_size]:
+                    counts[index[card]][hand_index] += 1
+                pos += hand_size
+            result.append(
+                tuple(cast(IntTupleOut, tuple(c)) for c in counts))
+        return result
@@ -82,6 +82,7 @@ class MultisetSource(MultisetSourceBase[T, int]):
 
 class MultisetGeneratorQuestlet(Questlet[T, int]):
     child_indexes = ()
+    stateless = True
 
     def initial_state(self, order, outcomes, child_sizes, source_sizes,
                       arg_sizes):
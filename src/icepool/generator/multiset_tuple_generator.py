@@ -48,6 +48,7 @@ class MultisetTupleSource(MultisetSourceBase[T, IntTupleOut]):
 
 class MultisetTupleGeneratorQuestlet(Questlet[T, IntTupleOut]):
     child_indexes = ()
+    stateless = True
 
     def initial_state(self, order, outcomes, child_sizes, source_sizes,
                       arg_sizes):
@@ -6,7 +6,7 @@ import icepool.math
 import icepool.creation_args
 import icepool.order
 from icepool.generator.multiset_generator import MultisetGenerator
-from icepool.generator.keep import KeepGenerator, KeepSource, pop_max_from_keep_tuple, pop_min_from_keep_tuple
+from icepool.generator.keep import KeepGenerator, KeepSource, collapse_dropped_outcomes, pop_max_from_keep_tuple, pop_min_from_keep_tuple
 from icepool.order import Order, OrderReason
 
 import itertools
@@ -171,6 +171,26 @@ class Pool(KeepGenerator[T]):
                                                 ...]) -> 'KeepGenerator[T]':
         return Pool._new_raw(self._dice, self._outcomes, keep_tuple)
 
+    def _map_outcomes(self, function: Callable[[T], T], /) -> 'Pool[T]':
+        dice_counts: MutableMapping['icepool.Die[T]', int] = defaultdict(int)
+        mapping = {outcome: function(outcome) for outcome in self._outcomes}
+        for die, count in self._dice:
+            data: MutableMapping[T, int] = defaultdict(int)
+            for outcome, quantity in die.items():
+                data[mapping[outcome]] += quantity
+            dice_counts[icepool.Die(data)] += count
+        outcomes = tuple(sorted(set(mapping.values())))
+        return Pool._new_from_mapping(dice_counts, outcomes, self._keep_tuple)
+
+    def _collapse_outcomes(self, keep: Callable[[T], bool], /) -> 'Pool[T]':
+        # Rank matters unless every die is counted the same.
+        if len(set(self._keep_tuple)) > 1:
+            return self
+        mapping = collapse_dropped_outcomes(self._outcomes, keep)
+        if mapping is None:
+            return self
+        return self._map_outcomes(mapping.__getitem__)
+
     def additive_union(
         *args: 'MultisetExpression[T] | Mapping[T, int] | Sequence[T]'
     ) -> 'MultisetExpression[T]':
@@ -328,6 +348,35 @@ class PoolSource(KeepSource[T]):
     def is_resolvable(self) -> bool:
         return all(len(die) for die, _ in self.dice)
 
+    def sample_raw(self, n: int, rng) -> list[tuple[T, ...]]:
+        if rng is not None and hasattr(rng, 'integers'):
+            # numpy.random.Generator: sort indexes into the pool's outcomes.
+            import numpy
+            pool_indexes = {
+                outcome: i
+                for i, outcome in enumerate(self._outcomes)
+            }
+            columns = [numpy.zeros((n, 0), dtype=numpy.intp)]
+            for die, count in self.dice:
+                die_to_pool = numpy.asarray(
+                    [pool_indexes[outcome] for outcome in die.outcomes()],
+                    dtype=numpy.intp)
+                die_indexes = numpy.asarray(die._sample_indexes(
+                    n * count, rng),
+                                            dtype=numpy.intp)
+                columns.append(die_to_pool[die_indexes].reshape(n, count))
+            rolls = numpy.sort(numpy.concatenate(columns, axis=1), axis=1)
+            outcomes = numpy.empty(len(self._outcomes), dtype=object)
+            outcomes[:] = self._outcomes
+            return list(map(tuple, outcomes[rolls].tolist()))
+        # Draw all rolls of each die at once, then split them by sample.
+        rows: list[list[T]] = [[] for _ in range(n)]
+        for die, count in self.dice:
+            rolls = die.sample(n * count, rng=rng)
+            for i, row in enumerate(rows):
+                row.extend(rolls[i * count:(i + 1) * count])
+        return [tuple(sorted(row)) for row in rows]
+
     @cached_property
     def _unique_dice(self) -> Collection['icepool.Die[T]']:
         return set(die for die, _ in self.dice)
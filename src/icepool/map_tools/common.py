@@ -38,6 +38,9 @@ class Break(Generic[T]):
         """
         self.outcome = outcome
 
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Break) and self.outcome == other.outcome
+
     def __hash__(self) -> int:
         return hash((Break, self.outcome))
 
@@ -5,7 +5,7 @@ from icepool.map_tools.common import Break, TransitionType, transition_and_star
 
 import enum
 
-from typing import Any, Callable, Generic, Literal, Mapping, MutableMapping, cast
+from typing import Any, Callable, Generic, Iterator, Literal, Mapping, MutableMapping, cast
 from icepool.typing import T, infer_star
 
 
@@ -54,11 +54,19 @@ def map_simple(
 
 
 class TransitionCache(Generic[T]):
-    """Helper class for caching a transition function for map(repeat)."""
+    """Helper class for caching a transition function for map(repeat).
+
+    If `repl` is a `Mapping`, the transition table is compiled in bulk on
+    construction, so that `step_state` and `is_self_loop` become pure lookups
+    and the mapping is never called through per state.
+    """
 
     _cache: 'MutableMapping[T, icepool.Die[tuple[TransitionType, T]]]'
     # state -> DEFAULT or BREAK
     _self_loop_cache: MutableMapping[T, TransitionType]
+    # Set if the transition table was compiled from a mapping.
+    # Any state not in this mapping is a self-loop.
+    _mapping: 'Mapping[Any, T | icepool.Die[T] | icepool.RerollType] | None'
 
     def __init__(
             self, repl:
@@ -71,46 +79,77 @@ class TransitionCache(Generic[T]):
         self._transition, self._star = transition_and_star(
             repl,
             len(extra_args) + 1, star)
+        if isinstance(repl, Mapping) and not callable(repl):
+            if kwargs:
+                raise TypeError(
+                    'Keyword arguments cannot be used with a mapping repl.')
+            self._mapping = repl
+            self._compile_mapping(repl)
+        else:
+            self._mapping = None
+
+    def _compile_mapping(
+        self,
+        mapping: 'Mapping[Any, T | icepool.Die[T] | icepool.RerollType]', /
+    ) -> None:
+        """Precomputes `is_self_loop` and `step_state` for all mapped states."""
+        # All self-loops must be known before any step can be classified.
+        for curr_state, next_state in mapping.items():
+            self._self_loop_cache[curr_state] = (
+                TransitionType.BREAK if self._is_self_loop_single(
+                    curr_state, next_state) else TransitionType.DEFAULT)
+        for curr_state, next_state in mapping.items():
+            step = self._step_single(curr_state, next_state)
+            self._cache[curr_state] = icepool.Die([] if step is None else
+                                                  [step])
+
+    def _call_transition(self, curr_state: T, extra_outcomes: tuple, /):
+        if self._star:
+            return self._transition(
+                *curr_state,  # type: ignore
+                *extra_outcomes,
+                **self._kwargs)
+        else:
+            return self._transition(curr_state, *extra_outcomes,
+                                    **self._kwargs)
+
+    @staticmethod
+    def _is_self_loop_single(curr_state: T, next_state, /) -> bool:
+        """Whether a single result of the transition function can only lead back to `curr_state`."""
+        if next_state is icepool.Reroll:
+            # Ignored.
+            return True
+        elif next_state is icepool.Restart:
+            # Might restart, therefore not a self-loop.
+            return False
+        elif isinstance(next_state, Break):
+            # Unwrap Break.
+            if next_state.outcome is None:
+                # Break to the current outcome.
+                return True
+            else:
+                next_state = next_state.outcome
+
+        if isinstance(next_state, icepool.Die):
+            return next_state.probability(curr_state) == 1
+        else:
+            return next_state == curr_state
 
     def is_self_loop(self, curr_state: T, /) -> TransitionType:
         """Returns `TransitionType.BREAK` if the state is a self-loop, or `DEFAULT` otherwise."""
         if curr_state in self._self_loop_cache:
             return self._self_loop_cache[curr_state]
+        if self._mapping is not None:
+            # Unmapped states stay the same.
+            return TransitionType.BREAK
 
         result = TransitionType.BREAK
         for extra_outcomes, quantity in icepool.iter_cartesian_product(
                 *self._extra_args):
-            if self._star:
-                next_state = self._transition(
-                    *curr_state,  # type: ignore
-                    *extra_outcomes,
-                    **self._kwargs)
-            else:
-                next_state = self._transition(curr_state, *extra_outcomes,
-                                              **self._kwargs)
-            if next_state is icepool.Reroll:
-                # Ignored.
-                continue
-            elif next_state is icepool.Restart:
-                # Might restart, therefore not a self-loop.
+            next_state = self._call_transition(curr_state, extra_outcomes)
+            if not self._is_self_loop_single(curr_state, next_state):
                 result = TransitionType.DEFAULT
                 break
-            elif isinstance(next_state, Break):
-                # Unwrap Break.
-                if next_state.outcome is None:
-                    # Break to the current outcome.
-                    continue
-                else:
-                    next_state = next_state.outcome
-
-            if isinstance(next_state, icepool.Die):
-                if next_state.probability(curr_state) == 1:
-                    continue
-            else:
-                if next_state == curr_state:
-                    continue
-            result = TransitionType.DEFAULT
-            break
 
         self._self_loop_cache[curr_state] = result
         return result
@@ -128,6 +167,33 @@ class TransitionCache(Generic[T]):
         return icepool.Die([(self.is_self_loop(o), o, 0)
                             for o in die.outcomes()], die.quantities())
 
+    def _step_single(
+        self, curr_state: T, next_state, /
+    ) -> 'tuple[TransitionType, T] | icepool.Die[tuple[TransitionType, T]] | None':
+        """Classifies a single result of the transition function.
+
+        Returns:
+            `None` if the result is to be pruned, or otherwise an outcome or
+            die whose outcomes are `(transition_type, next_state)`.
+        """
+        if next_state is icepool.Reroll:
+            return None  # Pruned immediately.
+        elif next_state is icepool.Restart:
+            # Will prune at end.
+            return (TransitionType.RESTART, None)  # type: ignore
+        elif isinstance(next_state, Break):
+            if next_state.outcome is None:
+                return (TransitionType.BREAK, curr_state)
+            else:
+                return (TransitionType.BREAK, next_state.outcome)
+        elif isinstance(next_state, icepool.Die):
+            # If the next state is a die, we need to conditionally break.
+            # This is why we keep the result as a single die rather than
+            # separate non-break and break dice.
+            return self.self_loop_die(next_state)
+        else:
+            return (self.is_self_loop(next_state), next_state)
+
     def step_state(self, curr_state: T,
                    /) -> 'icepool.Die[tuple[TransitionType, T]]':
         """Computes and caches a single step of the transition function for a single state.
@@ -136,48 +202,32 @@ class TransitionCache(Generic[T]):
 
         Args:
             curr_state: The current state.
-            include_reroll: Whether `TransitionType.REROLL`s are included in the result.
 
         Returns:
             A die whose outcomes are `(transition_type, next_state)`.
         """
         if curr_state in self._cache:
             return self._cache[curr_state]
-        next_state: T | icepool.Die[T]
+        if self._mapping is not None:
+            # Unmapped states stay the same.
+            result: 'icepool.Die[tuple[TransitionType, T]]' = icepool.Die([
+                (TransitionType.BREAK, curr_state)
+            ])
+            self._cache[curr_state] = result
+            return result
+
         next_states: list[tuple[TransitionType, T]
                           | icepool.Die[tuple[TransitionType, T]]] = []
         next_quantities: list[int] = []
         for extra_outcomes, quantity in icepool.iter_cartesian_product(
                 *self._extra_args):
-            if self._star:
-                next_state = self._transition(
-                    *curr_state,  # type: ignore
-                    *extra_outcomes,
-                    **self._kwargs)
-            else:
-                next_state = self._transition(curr_state, *extra_outcomes,
-                                              **self._kwargs)
-            if next_state is icepool.Reroll:
-                continue  # Pruned immediately.
-            elif next_state is icepool.Restart:
-                # Will prune at end.
-                next_states.append((TransitionType.RESTART, None))
-            elif isinstance(next_state, Break):
-                if next_state.outcome is None:
-                    next_states.append((TransitionType.BREAK, curr_state))
-                else:
-                    next_states.append(
-                        (TransitionType.BREAK, next_state.outcome))
-            elif isinstance(next_state, icepool.Die):
-                # If the next state is a die, we need to conditionally break.
-                # This is why we keep the result as a single die rather than
-                # separate non-break and break dice.
-                next_states.append(self.self_loop_die(next_state))
-            else:
-                next_states.append((self.is_self_loop(next_state), next_state))
+            step = self._step_single(
+                curr_state, self._call_transition(curr_state, extra_outcomes))
+            if step is None:
+                continue
+            next_states.append(step)
             next_quantities.append(quantity)
-        result: 'icepool.Die[tuple[TransitionType, T]]' = icepool.Die(
-            next_states, next_quantities)
+        result = icepool.Die(next_states, next_quantities)
         self._cache[curr_state] = result
         return result
 
@@ -211,3 +261,28 @@ class TransitionCache(Generic[T]):
             for transition_type, curr_state, time in curr_die.outcomes()
         ]
         return icepool.Die(next_states, curr_die.quantities())
+
+    def iter_transition_die(
+        self, curr_die: 'icepool.Die[tuple[TransitionType, T]]',
+        repeat: int | None, /
+    ) -> 'Iterator[icepool.Die[tuple[TransitionType, T]]]':
+        """Yields the (transition_type, state) distribution at each time step.
+
+        The first die yielded is `curr_die` itself. Iteration stops early once
+        no `TransitionType.DEFAULT` outcomes remain.
+
+        Args:
+            curr_die: The initial distribution as a die whose outcomes are
+                `(transition_type, state)`.
+            repeat: The maximum number of steps to take. If `None`, this
+                continues until all states have been absorbed.
+        """
+        yield curr_die
+        i = 0
+        while repeat is None or i < repeat:
+            if not any(transition_type == TransitionType.DEFAULT
+                       for transition_type, _ in curr_die):
+                return
+            curr_die = self.step_transition_die(curr_die)
+            yield curr_die
+            i += 1
@@ -1,9 +1,9 @@
 __docformat__ = 'google'
 
 import icepool
-import icepool.map_tools.markov_chain
-from icepool.map_tools.common import TransitionType, transition_and_star
-from icepool.map_tools.core_impl import TransitionCache, map_simple
+from icepool.map_tools.common import transition_and_star
+from icepool.map_tools.core_impl import map_simple
+from icepool.map_tools.markov_process import MarkovProcess
 
 from collections import defaultdict
 from fractions import Fraction
@@ -13,14 +13,6 @@ from typing import Any, Callable, Iterable, Iterator, Literal, Mapping, MutableM
 from icepool.typing import Outcome, T
 
 
-def final_map(transition_type: TransitionType,
-              outcome: T) -> T | icepool.RerollType:
-    if transition_type in [TransitionType.DEFAULT, TransitionType.BREAK]:
-        return outcome
-    else:
-        return icepool.Reroll
-
-
 @overload
 def map(
         repl:
@@ -154,27 +146,8 @@ def map(
 
     # No Agains allowed past here.
     repl = cast('Callable[..., T | icepool.Die[T] | icepool.RerollType]', repl)
-    transition_cache = TransitionCache(repl, *extra_args, star=star, **kwargs)
-
-    if repeat == 'inf':
-        # Infinite repeat.
-        # T_co and U should be the same in this case.
-        return icepool.map_tools.markov_chain.absorbing_markov_chain_die(
-            transition_cache, first_arg)
-    elif repeat < 0:
-        raise ValueError('repeat cannot be negative.')
-    elif repeat == 0:
-        return icepool.Die([first_arg])
-    else:
-        transition_die = transition_cache.self_loop_die(
-            icepool.Die([first_arg]))
-        for i in range(repeat):
-            transition_die = transition_cache.step_transition_die(
-                transition_die)
-            if not any(transition_type == TransitionType.DEFAULT
-                       for transition_type, _ in transition_die):
-                break
-        return transition_die.map(final_map, star=True)
+    return MarkovProcess(repl, *extra_args, star=star,
+                         **kwargs).map(first_arg, repeat=repeat)
 
 
 @overload
@@ -335,25 +308,65 @@ def map_and_time(
     Returns:
         The `Die` after the modification.
     """
-    # Here len(args) is at least 1.
-    extra_dice: 'Sequence[T | icepool.Die[T]]' = [
-        (
-            arg.expand() if isinstance(arg, icepool.MultisetExpression) else
-            arg  # type: ignore
-        ) for arg in extra_args
-    ]
+    return MarkovProcess(repl, *extra_args, star=star,
+                         **kwargs).map_and_time(initial_state, repeat=repeat)
+
+
+def map_iter(
+        repl:
+    'Callable[..., T | icepool.Die[T] | icepool.RerollType] | Mapping[Any, T | icepool.Die[T] | icepool.RerollType]',
+        initial_state: 'T | icepool.Die[T]',
+        /,
+        *extra_args,
+        star: bool | None = None,
+        repeat: int | None = None,
+        **kwargs) -> Iterator['icepool.Die[T]']:
+    """EXPERIMENTAL: Repeatedly map outcomes of the state to other outcomes, yielding the state distribution at each time step.
+
+    The first die yielded is the initial state, and the die yielded after `n`
+    steps is the same as `map(repl, initial_state, *extra_args, repeat=n)`.
+    Unlike calling `map()` once per `n`, the transition function is only
+    evaluated once per distinct state across the whole iteration.
+
+    This will stop early if the entire state distribution has converged to
+    absorbing states. The last die yielded in this case is the absorbed
+    distribution.
+
+    For example, the distribution of the running total of d6s, capped at 10:
+    ```python
+    for t, total in enumerate(map_iter(lambda x, y: min(x + y, 10), 0, d6)):
+        print(t, total.probability('<', 10))
+    ```
 
-    transition_cache = TransitionCache(repl, *extra_dice, star=star, **kwargs)
+    Args:
+        repl: One of the following:
+            * A callable returning a new outcome for each old outcome.
+            * A mapping from old outcomes to new outcomes.
+                Unmapped old outcomes stay the same.
+            The new outcomes may be dice rather than just single outcomes.
+            The special value `icepool.Reroll` will reroll that old outcome.
+            `Break` and `Restart` are handled as in `map(repeat)`.
+        initial_state: The initial state of the process, which could be a
+            single state or a `Die`.
+        extra_args: Extra arguments to use, as per `map`. Note that these are
+            rerolled at every time step.
+        star: If `True`, the first of the args will be unpacked before giving
+            them to `func`.
+            If not provided, it will be guessed based on the signature of `func`
+            and the number of arguments.
+        repeat: The maximum number of steps to take. If not provided, this
+            will continue until all states have been absorbed, which may be
+            never.
+        **kwargs: Keyword-only arguments can be forwarded to a callable `repl`.
+            Unlike *args, outcomes will not be expanded, i.e. `Die` and
+            `MultisetExpression` will be passed as-is. This is invalid for
+            non-callable `repl`.
 
-    transition_die = transition_cache.self_loop_die_with_zero_time(
-        icepool.Die([initial_state]))
-    for i in range(repeat):
-        transition_die = transition_cache.step_transition_die_with_time(
-            transition_die)
-        if not any(transition_type == TransitionType.DEFAULT
-                   for transition_type, state, time in transition_die):
-            break
-    return transition_die.marginals[1:]
+    Yields:
+        The state distribution after 0, 1, 2, ... steps.
+    """
+    return MarkovProcess(repl, *extra_args, star=star,
+                         **kwargs).map_iter(initial_state, repeat=repeat)
 
 
 def mean_time_to_absorb(
@@ -392,13 +405,8 @@ def mean_time_to_absorb(
     Returns:
         The mean time to absorption.
     """
-    transition_cache = TransitionCache(repl, *extra_args, star=star, **kwargs)
-
-    # Infinite repeat.
-    # T_co and U should be the same in this case.
-
-    return icepool.map_tools.markov_chain.absorbing_markov_chain_mean_absorption_time(
-        transition_cache, initial_state)
+    return MarkovProcess(repl, *extra_args, star=star,
+                         **kwargs).mean_time_to_absorb(initial_state)
 
 
 def map_to_pool(
@@ -10,12 +10,14 @@ from collections import defaultdict
 
 from icepool.typing import Outcome, T
 from fractions import Fraction
-from typing import Callable, MutableMapping
+from typing import Callable, Generic, Iterable, MutableMapping
 
 
 class SpecialValue(enum.Enum):
-    Visit = 'Visit'
-    """Indicates the numerator of the number of visits to a particular state."""
+    Absorb = 'Absorb'
+    """Paired with an absorbing state to indicate the numerator of the chance of being absorbed into that state."""
+    Time = 'Time'
+    """Indicates the numerator of the mean absorption time."""
     Restart = 'Restart'
     """Indicates that a Restart was triggered."""
 
@@ -73,191 +75,199 @@ class SparseVector(MutableMapping[T, int]):
         return str(self._data)
 
 
-def absorbing_markov_chain_impl(
-    transition_cache: TransitionCache[T],
-    initial_state: 'T | icepool.Die[T]',
-) -> 'tuple[icepool.Die[T], Fraction | None]':
-    """Computes the absorption distribution of an absorbing Markov chain.
+class AbsorbingMarkovChain(Generic[T]):
+    """Solves an absorbing Markov chain, caching the solution per transient state.
 
-    Zero-weight outcomes will not be preserved.
-
-    Args:
-        die: A die representing the initial state.
-        function: A transition function. Any state that leads only to itself will
-            be considered absorbing.
-
-    Returns:
-        A `Die` in simplest form reprensenting the absorption distribution,
-        and the mean absorption time.
-    """
+    Unlike public objects, this class is mutable.
 
-    # Find all reachable states.
-
-    # outcome -> Die representing the next distribution
-    # The outcomes of the Die are (is_absorbing, outcome)
-    transients: MutableMapping[T, icepool.Die[tuple[TransitionType, T]]] = {}
-
-    initial_die: 'icepool.Die' = icepool.Die([initial_state])
-    initial_transition_types = transition_cache.self_loop_die(
-        initial_die).group_by[0]
-    if TransitionType.DEFAULT in initial_transition_types:
-        initial_transient = initial_transition_types[
-            TransitionType.DEFAULT].marginals[1]
-    else:
-        # No transients; everything is absorbed immediately.
-        return initial_die.simplify(), Fraction(0, 1)
-    if TransitionType.BREAK in initial_transition_types:
-        initial_absorb = initial_transition_types[
-            TransitionType.BREAK].marginals[1]
-    else:
-        initial_absorb = icepool.Die([])
-
-    frontier = set()
-    for outcome in initial_transient:
-        frontier.add(outcome)
-    while frontier:
-        curr_state = frontier.pop()
-        transients[curr_state] = transition_cache.step_state(curr_state)
-        for transition_type, next_outcome in transients[curr_state]:
-            if transition_type is TransitionType.DEFAULT and next_outcome not in transients:
-                frontier.add(next_outcome)
-
-    # Create the transient matrix to be solved.
-    t = len(transients)
-
-    outcome_to_index = {
-        outcome: i
-        for i, outcome in enumerate(transients.keys())
-    }
-    """Supposing the transition matrix has the form
-    
+    For each transient state `i` we solve the first-step equations
     ```
-    Q 0
-    A I
+    h_i = r_i + sum_j Q_ij h_j
     ```
-    with the state vector on the right, then `fundamental_solve` is solving
-    the equation
-    `(I - Q) v = s`
-    where `s` is the starting state vector, and `v` is the visit vector which
-    gives the number of visits to each transient state.
-    We solve this in unnormalized form, so instead of being 1, `I` is equal to
-    the denominator of the transition from the source state.
+    where `r_i` is the vector of chances of being absorbed into each
+    absorbing state immediately, along with one unit of time and the chance of
+    restarting. We solve this in unnormalized form, so instead of being 1,
+    the coefficient of `h_i` is the denominator of the transition from `i`.
+
+    Once a transient state is solved, its row is kept. Later queries from new
+    initial states only solve for transient states that haven't been seen
+    before, substituting the existing solution for any that have.
     """
-    # [dst_index][src]
-    fundamental_solve: list[SparseVector[T]] = [
-        SparseVector() for _ in transients.keys()
-    ]
-    # [src_index][absorbing state]
-    absorption_matrix: list[SparseVector[T]] = [
-        SparseVector() for _ in transients.keys()
-    ]
-    has_restart = False
-    for src_index, (src, transition) in enumerate(transients.items()):
-        # The identity term.
-        fundamental_solve[src_index][src] += transition.denominator()
-        for (transition_type, dst), quantity in transition.items():
-            if transition_type is TransitionType.BREAK:
-                absorption_matrix[src_index][dst] = quantity
-            elif transition_type is TransitionType.RESTART:
-                # transition to nowhere
-                has_restart = True
+
+    # transient state -> row with the keys:
+    # * The state itself, whose value is the denominator of the row.
+    # * (SpecialValue.Absorb, absorbing_state)
+    # * SpecialValue.Time
+    # * SpecialValue.Restart
+    _solved: 'MutableMapping[T, SparseVector]'
+
+    def __init__(self, transition_cache: TransitionCache[T]):
+        self._transition_cache = transition_cache
+        self._solved = {}
+
+    def _solve(self, initial_states: Iterable[T], /) -> None:
+        """Solves all transient states reachable from the given states."""
+        transition_cache = self._transition_cache
+        solved = self._solved
+
+        # Find all reachable states that haven't been solved yet.
+
+        # outcome -> Die representing the next distribution
+        # The outcomes of the Die are (transition_type, outcome)
+        transients: MutableMapping[T, icepool.Die[tuple[TransitionType,
+                                                        T]]] = {}
+        frontier = set(state for state in initial_states
+                       if state not in solved)
+        while frontier:
+            curr_state = frontier.pop()
+            transients[curr_state] = transition_cache.step_state(curr_state)
+            for transition_type, next_outcome in transients[curr_state]:
+                if (transition_type is TransitionType.DEFAULT
+                        and next_outcome not in transients
+                        and next_outcome not in solved):
+                    frontier.add(next_outcome)
+
+        if not transients:
+            return
+
+        # Create the matrix to be solved.
+        rows: list[SparseVector] = []
+        for src, transition in transients.items():
+            row: SparseVector = SparseVector()
+            denominator = transition.denominator()
+            # The identity term.
+            row[src] += denominator
+            row[SpecialValue.Time] += denominator
+            known: list[tuple[T, int]] = []
+            for (transition_type, dst), quantity in transition.items():
+                if transition_type is TransitionType.BREAK:
+                    row[(SpecialValue.Absorb, dst)] += quantity
+                elif transition_type is TransitionType.RESTART:
+                    row[SpecialValue.Restart] += quantity
+                elif dst in solved:
+                    known.append((dst, quantity))
+                else:
+                    # Minus Q.
+                    row[dst] -= quantity
+            if known:
+                # Substitute previously solved states into the right-hand side.
+                row_scale = math.lcm(*(solved[dst][dst] for dst, _ in known))
+                row = row * row_scale
+                for dst, quantity in known:
+                    known_row = solved[dst]
+                    factor = quantity * (row_scale // known_row[dst])
+                    for key, value in known_row.items():
+                        if key != dst:
+                            row[key] += factor * value
+                row.simplify()
+            rows.append(row)
+
+        # Solve the matrix using Gauss-Jordan elimination.
+        t = len(transients)
+
+        # Put into upper triangular form.
+        for pivot_index, pivot in enumerate(transients.keys()):
+            pivot_row = None
+            for i in range(pivot_index, t):
+                row = rows[i]
+                if row[pivot] != 0:
+                    pivot_row = rows[i]
+                    rows[i] = rows[pivot_index]
+                    rows[pivot_index] = pivot_row
+                    break
             else:
-                # Minus Q.
-                dst_index = outcome_to_index[dst]
-                fundamental_solve[dst_index][src] -= quantity
-    for src_index, src in enumerate(transients.keys()):
-        # Setting `s`.
-        fundamental_solve[src_index][
-            SpecialValue.Visit] = initial_transient.quantity(src)
-
-    # Solve the matrix using Gaussian elimination.
-
-    # Put into upper triangular form.
-
-    for pivot_index, pivot in enumerate(transients.keys()):
-        pivot_row = None
-        for i in range(pivot_index, t):
-            row = fundamental_solve[i]
-            if row[pivot] != 0:
-                pivot_row = fundamental_solve[i]
-                fundamental_solve[i] = fundamental_solve[pivot_index]
-                fundamental_solve[pivot_index] = pivot_row
-                break
+                raise ValueError(
+                    'Matrix has deficient rank. This likely indicates that the Markov process has a chance of not terminating.'
+                )
+
+            for i in range(pivot_index + 1, t):
+                factor = rows[i][pivot]
+                if factor == 0:
+                    # Nothing to eliminate; skip the rescale and renormalization.
+                    continue
+                rows[i] = rows[i] * pivot_row[pivot] - pivot_row * factor
+                rows[i].simplify()
+
+        # Back-substitute.
+        for pivot_index, pivot in reversed(list(enumerate(transients.keys()))):
+            pivot_row = rows[pivot_index]
+            for i in range(pivot_index):
+                factor = rows[i][pivot]
+                if factor == 0:
+                    continue
+                rows[i] = rows[i] * pivot_row[pivot] - pivot_row * factor
+                rows[i].simplify()
+
+        for pivot, row in zip(transients.keys(), rows):
+            solved[pivot] = row
+
+    def solve(
+        self,
+        initial_state: 'T | icepool.Die[T]',
+    ) -> 'tuple[icepool.Die[T], Fraction | None]':
+        """Computes the absorption distribution of the chain.
+
+        Zero-weight outcomes will not be preserved.
+
+        Args:
+            initial_state: The initial state, or a die representing the
+                initial distribution.
+
+        Returns:
+            A `Die` in simplest form reprensenting the absorption distribution,
+            and the mean absorption time, or `None` if a `Restart` is
+            reachable.
+        """
+        initial_die: 'icepool.Die' = icepool.Die([initial_state])
+        initial_transition_types = self._transition_cache.self_loop_die(
+            initial_die).group_by[0]
+        if TransitionType.DEFAULT in initial_transition_types:
+            initial_transient = initial_transition_types[
+                TransitionType.DEFAULT].marginals[1]
+        else:
+            # No transients; everything is absorbed immediately.
+            return initial_die.simplify(), Fraction(0, 1)
+        if TransitionType.BREAK in initial_transition_types:
+            initial_absorb = initial_transition_types[
+                TransitionType.BREAK].marginals[1]
         else:
-            raise ValueError(
-                'Matrix has deficient rank. This likely indicates that the Markov process has a chance of not terminating.'
-            )
-
-        for i in range(pivot_index + 1, t):
-            fundamental_solve[i] = fundamental_solve[i] * pivot_row[
-                pivot] - pivot_row * fundamental_solve[i][pivot]
-            fundamental_solve[i].simplify()
-
-    # Solve for the visit vector `v`.
-    for pivot_index, pivot in reversed(list(enumerate(transients.keys()))):
-        pivot_row = fundamental_solve[pivot_index]
-        for i in range(pivot_index):
-            fundamental_solve[i] = fundamental_solve[i] * pivot_row[
-                pivot] - pivot_row * fundamental_solve[i][pivot]
-            fundamental_solve[i].simplify()
-
-    mean_absorption_time = Fraction(0, 1)
-
-    results = {}
-    for pivot_index, (pivot, absorption_row) in enumerate(
-            zip(transients.keys(), absorption_matrix)):
-        # n / d is an element of the visit vector `v`.
-        n = fundamental_solve[pivot_index][SpecialValue.Visit]
-        if n == 0:
-            continue
-        d = fundamental_solve[pivot_index][pivot]
-
-        # Compared to the normalized formula, I and Q were scaled up by a
-        # factor transients[pivot].denominator() so (I - Q)^-1 was reduced
-        # by the same factor. So we put the factor back here.
-        mean_absorption_time += Fraction(n,
-                                         d) * transients[pivot].denominator()
-
-        if len(absorption_row) > 0:
-            results[pivot] = (n * absorption_row, d)
-
-    results_denominator = math.lcm(*(d for _, d in results.values()))
-    normalized_results: MutableMapping[T, int] = defaultdict(int)
-    for row, d in results.values():
-        factor = results_denominator // d
-        for outcome, quantity in row.items():
-            normalized_results[outcome] += quantity * factor
-
-    # Inference to Die[T] seems to fail here.
-    transient_absorb: 'icepool.Die' = icepool.Die(
-        normalized_results).simplify()
-    result: 'icepool.Die' = icepool.Die(
-        [initial_absorb, transient_absorb],
-        [initial_absorb.denominator(),
-         initial_transient.denominator()]).simplify()
-
-    if has_restart:
-        mean_absorption_time = None  # type: ignore
-    else:
-        # The starting vector `s` was not normalized, so we divide it out here.
-        mean_absorption_time /= initial_die.denominator()
-
-    return result, mean_absorption_time
-
-
-def absorbing_markov_chain_die(
-    transition_cache: TransitionCache[T],
-    initial_state: 'T | icepool.Die[T]',
-) -> 'icepool.Die[T]':
-    return absorbing_markov_chain_impl(transition_cache, initial_state)[0]
-
-
-def absorbing_markov_chain_mean_absorption_time(
-    transition_cache: TransitionCache[T],
-    initial_state: 'T | icepool.Die[T]',
-) -> Fraction:
-    time = absorbing_markov_chain_impl(transition_cache, initial_state)[1]
-    if time is None:
-        raise NotImplementedError(
-            'Restart not implemented for mean_time_to_absorb.')
-    return time
+            initial_absorb = icepool.Die([])
+
+        self._solve(initial_transient.outcomes())
+
+        # Mix the solutions over a common denominator, reducing only once.
+        solutions = [(state, self._solved[state], quantity)
+                     for state, quantity in initial_transient.items()
+                     if quantity > 0]
+        solution_denominator = math.lcm(*(row[state]
+                                          for state, row, _ in solutions))
+        total: SparseVector = SparseVector()
+        for state, row, quantity in solutions:
+            factor = quantity * (solution_denominator // row[state])
+            for key, value in row.items():
+                if key != state:
+                    total[key] += factor * value
+
+        absorbed: MutableMapping[T, int] = {}
+        for key, value in total.items():
+            if isinstance(key, tuple) and key[0] is SpecialValue.Absorb:
+                absorbed[key[1]] = value
+
+        # Inference to Die[T] seems to fail here.
+        transient_absorb: 'icepool.Die' = icepool.Die(absorbed).simplify()
+        result: 'icepool.Die' = icepool.Die(
+            [initial_absorb, transient_absorb],
+            [initial_absorb.denominator(),
+             initial_transient.denominator()]).simplify()
+
+        mean_absorption_time: Fraction | None
+        if total[SpecialValue.Restart] != 0:
+            mean_absorption_time = None
+        else:
+            # Initial states that are absorbed immediately contribute zero
+            # time but still count towards the denominator.
+            mean_absorption_time = Fraction(
+                total[SpecialValue.Time],
+                solution_denominator * initial_die.denominator())
+
+        return result, mean_absorption_time
@@ -0,0 +1,145 @@
+__docformat__ = 'google'
+
+import icepool
+from icepool.map_tools.common import TransitionType
+from icepool.map_tools.core_impl import TransitionCache
+from icepool.map_tools.markov_chain import AbsorbingMarkovChain
+
+from fractions import Fraction
+
+from typing import Any, Callable, Generic, Iterator, Literal, Mapping, Sequence
+from icepool.typing import T
+
+
+def final_map(transition_type: TransitionType,
+              outcome: T) -> T | icepool.RerollType:
+    if transition_type in [TransitionType.DEFAULT, TransitionType.BREAK]:
+        return outcome
+    else:
+        return icepool.Reroll
+
+
+class MarkovProcess(Generic[T]):
+    """EXPERIMENTAL: A reusable Markov process defined by a transition function.
+
+    `map(repeat)`, `map_iter()`, `map_and_time()` and `mean_time_to_absorb()`
+    all build a new process on every call. If the same transition function is
+    used many times with different initial states or numbers of steps, create
+    a `MarkovProcess` once instead. This keeps:
+
+    * The result of the transition function for every state visited so far.
+    * The solution for every transient state visited by `repeat='inf'` or
+        `mean_time_to_absorb()` so far. Later queries only solve for states
+        that haven't been seen before.
+
+    Example:
+    ```python
+    process = MarkovProcess(lambda x, y: min(x + y, 10), d6)
+    process.map(0, repeat='inf')
+    process.map(d4, repeat='inf')  # Reuses the solution from above.
+    ```
+    """
+
+    def __init__(
+            self,
+            repl:
+        'Callable[..., T | icepool.Die[T] | icepool.RerollType] | Mapping[Any, T | icepool.Die[T] | icepool.RerollType]',
+            /,
+            *extra_args,
+            star: bool | None = None,
+            **kwargs):
+        """Constructor.
+
+        Args:
+            repl: One of the following:
+                * A callable returning a new outcome for each old outcome.
+                * A mapping from old outcomes to new outcomes.
+                    Unmapped old outcomes stay the same.
+                The new outcomes may be dice rather than just single outcomes.
+                The special values `Reroll`, `Restart` and `Break` have the
+                same meaning as in `map(repeat)`.
+            extra_args: Extra arguments to use, as per `map`. Note that these
+                are rerolled at every time step.
+            star: If `True`, the state will be unpacked before giving it to
+                `repl`.
+                If not provided, it will be guessed based on the signature of
+                `repl` and the number of arguments.
+            **kwargs: Keyword-only arguments can be forwarded to a callable
+                `repl`. Unlike *args, outcomes will not be expanded, i.e. `Die`
+                and `MultisetExpression` will be passed as-is. This is invalid
+                for non-callable `repl`.
+        """
+        extra_dice: 'Sequence[T | icepool.Die[T]]' = [
+            (
+                arg.expand() if isinstance(arg, icepool.MultisetExpression)
+                else arg  # type: ignore
+            ) for arg in extra_args
+        ]
+        self._transition_cache = TransitionCache(repl,
+                                                 *extra_dice,
+                                                 star=star,
+                                                 **kwargs)
+        self._absorbing_chain = AbsorbingMarkovChain(self._transition_cache)
+
+    def map(self, initial_state: 'T | icepool.Die[T]', /,
+            repeat: int | Literal['inf']) -> 'icepool.Die[T]':
+        """The state distribution after running the process.
+
+        As `map(repl, initial_state, *extra_args, repeat=repeat)`.
+        """
+        if repeat == 'inf':
+            # Infinite repeat.
+            return self._absorbing_chain.solve(initial_state)[0]
+        elif repeat < 0:
+            raise ValueError('repeat cannot be negative.')
+        elif repeat == 0:
+            return icepool.Die([initial_state])
+        else:
+            for transition_die in self._transition_cache.iter_transition_die(
+                    self._transition_cache.self_loop_die(
+                        icepool.Die([initial_state])), repeat):
+                pass
+            return transition_die.map(final_map, star=True)
+
+    def map_iter(self,
+                 initial_state: 'T | icepool.Die[T]',
+                 /,
+                 repeat: int | None = None) -> Iterator['icepool.Die[T]']:
+        """Yields the state distribution at each time step.
+
+        As `map_iter(repl, initial_state, *extra_args, repeat=repeat)`.
+        """
+        if repeat is not None and repeat < 0:
+            raise ValueError('repeat cannot be negative.')
+        for transition_die in self._transition_cache.iter_transition_die(
+                self._transition_cache.self_loop_die(
+                    icepool.Die([initial_state])), repeat):
+            yield transition_die.map(final_map, star=True)
+
+    def map_and_time(self, initial_state: 'T | icepool.Die[T]', /,
+                     repeat: int) -> 'icepool.Die[tuple[T, int]]':
+        """The state distribution after running the process, along with the absorption time.
+
+        As `map_and_time(repl, initial_state, *extra_args, repeat=repeat)`.
+        """
+        transition_die = self._transition_cache.self_loop_die_with_zero_time(
+            icepool.Die([initial_state]))
+        for i in range(repeat):
+            transition_die = self._transition_cache.step_transition_die_with_time(
+                transition_die)
+            if not any(transition_type == TransitionType.DEFAULT
+                       for transition_type, state, time in transition_die):
+                break
+        return transition_die.marginals[1:]
+
+    def mean_time_to_absorb(self, initial_state: 'T | icepool.Die[T]',
+                            /) -> Fraction:
+        """EXPERIMENTAL: The mean time for the process to reach an absorbing state.
+
+        As `mean_time_to_absorb(repl, initial_state, *extra_args)`.
+        """
+        time = self._absorbing_chain.solve(initial_state)[1]
+        if time is None:
+            raise NotImplementedError(
+                'Restart not implemented for mean_time_to_absorb.')
+        return time
@@ -1,5 +1,7 @@
 __docformat__ = 'google'
 
+import icepool
+
 from icepool.expression.multiset_expression import MultisetExpression
 from icepool.operator.multiset_operator import MultisetOperator
 
@@ -36,6 +38,10 @@ class MultisetMapCounts(MultisetOperator[T]):
     def _expression_key(self):
         return type(self), self._function
 
+    @property
+    def _stateless(self) -> bool:
+        return True
+
 
 class MultisetCountOperator(MultisetOperator[T]):
 
@@ -57,6 +63,10 @@ class MultisetCountOperator(MultisetOperator[T]):
     def _expression_key(self):
         return type(self), self._constant
 
+    @property
+    def _stateless(self) -> bool:
+        return True
+
 
 class MultisetMultiplyCounts(MultisetCountOperator):
     """Multiplies all counts by the constant."""
@@ -67,6 +77,18 @@ class MultisetMultiplyCounts(MultisetCountOperator):
     def __str__(self) -> str:
         return f'({self._children[0]} * {self._constant})'
 
+    def _rewrite(self, children):
+        child, = children
+        if self._constant == 1:
+            return child
+        if isinstance(child, MultisetMultiplyCounts):
+            return MultisetMultiplyCounts(child._children[0],
+                                          constant=child._constant *
+                                          self._constant)
+        if isinstance(child, icepool.KeepGenerator):
+            return child.multiply_counts(self._constant)
+        return self._replace_children(children)
+
     def _initial_state(self, order, outcomes, child_sizes: Sequence,
                        source_sizes: Iterator, arg_sizes: Sequence):
         child_size = child_sizes[0]
@@ -85,6 +107,18 @@ class MultisetFloordivCounts(MultisetCountOperator):
     def __str__(self) -> str:
         return f'({self._children[0]} // {self._constant})'
 
+    def _rewrite(self, children):
+        child, = children
+        if self._constant == 1:
+            return child
+        # (x // a) // b == x // (a * b) for positive a and b.
+        if (isinstance(child, MultisetFloordivCounts) and child._constant > 0
+                and self._constant > 0):
+            return MultisetFloordivCounts(child._children[0],
+                                          constant=child._constant *
+                                          self._constant)
+        return self._replace_children(children)
+
 
 class MultisetModuloCounts(MultisetCountOperator):
     """Modulo all counts by the constant."""
@@ -108,6 +142,14 @@ class MultisetUnique(MultisetCountOperator):
         else:
             return f'{self._children[0]}.unique({self._constant})'
 
+    def _rewrite(self, children):
+        child, = children
+        if isinstance(child, MultisetUnique):
+            return MultisetUnique(child._children[0],
+                                  constant=min(child._constant,
+                                               self._constant))
+        return self._replace_children(children)
+
 
 class MultisetKeepCounts(MultisetOperator[T]):
 
@@ -141,5 +183,27 @@ class MultisetKeepCounts(MultisetOperator[T]):
     def _expression_key(self):
         return type(self), self._comparison, self._constant
 
+    @property
+    def _stateless(self) -> bool:
+        return True
+
     def __str__(self) -> str:
         return f"{self._children[0]}.keep_counts('{self._comparison}', {self._constant})"
+
+    def _rewrite(self, children):
+        child, = children
+        # Dropped counts become zero, which stays zero through a later
+        # keep_counts. So two thresholds in the same direction reduce to
+        # the stricter one.
+        if (isinstance(child, MultisetKeepCounts)
+                and child._comparison == self._comparison):
+            if self._comparison in ('>=', '>'):
+                constant = max(child._constant, self._constant)
+            elif self._comparison in ('<=', '<'):
+                constant = min(child._constant, self._constant)
+            else:
+                return self._replace_children(children)
+            return MultisetKeepCounts(child._children[0],
+                                      comparison=self._comparison,
+                                      constant=constant)
+        return self._replace_children(children)
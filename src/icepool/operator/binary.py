@@ -36,6 +36,26 @@ class MultisetBinaryOperator(MultisetOperator[T]):
     def symbol() -> str:
         """A symbol representing this operation."""
 
+    @property
+    def _associative(self) -> bool:
+        """Whether nested applications of this operator can be flattened.
+
+        Defaults to `False`.
+        """
+        return False
+
+    def _rewrite(self, children):
+        if self._associative and any(
+                type(child) is type(self) for child in children):
+            flattened: list[MultisetExpression[T]] = []
+            for child in children:
+                if type(child) is type(self):
+                    flattened.extend(child._children)
+                else:
+                    flattened.append(child)
+            return type(self)(*flattened)
+        return self._replace_children(children)
+
     def _next_state(self, state, order, outcome, child_counts, source_counts,
                     arg_counts):
         count = reduce(self.merge_counts, child_counts)
@@ -45,6 +65,10 @@ class MultisetBinaryOperator(MultisetOperator[T]):
     def _expression_key(self):
         return type(self)
 
+    @property
+    def _stateless(self) -> bool:
+        return True
+
     def __str__(self) -> str:
         return '(' + (' ' + self.symbol() + ' ').join(
             str(child) for child in self._children) + ')'
@@ -60,6 +84,10 @@ class MultisetIntersection(MultisetBinaryOperator):
     def symbol() -> str:
         return '&'
 
+    @property
+    def _associative(self) -> bool:
+        return True
+
 
 class MultisetDifferenceDropNegative(MultisetBinaryOperator):
 
@@ -93,6 +121,10 @@ class MultisetUnion(MultisetBinaryOperator):
     def symbol() -> str:
         return '|'
 
+    @property
+    def _associative(self) -> bool:
+        return True
+
 
 class MultisetAdditiveUnion(MultisetBinaryOperator):
 
@@ -104,13 +136,16 @@ class MultisetAdditiveUnion(MultisetBinaryOperator):
     def symbol() -> str:
         return '+'
 
+    @property
+    def _associative(self) -> bool:
+        return True
+
     def _initial_state(self, order, outcomes, child_sizes: Sequence,
                        source_sizes: Iterator, arg_sizes: Sequence):
-        left_size, right_size = child_sizes
-        if left_size is None or right_size is None:
+        if any(size is None for size in child_sizes):
             return None, None
         else:
-            return None, child_sizes[0] + child_sizes[1]
+            return None, sum(child_sizes)
 
 
 class MultisetSymmetricDifference(MultisetBinaryOperator):
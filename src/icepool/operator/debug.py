@@ -30,3 +30,7 @@ class MultisetForceOrder(MultisetOperator[T]):
     @property
     def _expression_key(self):
         return type(self), self._force_order
+
+    @property
+    def _stateless(self) -> bool:
+        return True
@@ -1,5 +1,7 @@
 __docformat__ = 'google'
 
+import icepool
+
 from icepool.expression.multiset_expression import MultisetExpression
 from icepool.operator.multiset_operator import MultisetOperator
 
@@ -21,7 +23,8 @@ class MultisetFilterOutcomes(MultisetOperator[T]):
                  /,
                  *,
                  outcomes: Callable[[T], bool] | Collection[T],
-                 invert: bool = False) -> None:
+                 invert: bool = False,
+                 collapse: bool = False) -> None:
         """Constructor.
 
         Args:
@@ -29,37 +32,84 @@ class MultisetFilterOutcomes(MultisetOperator[T]):
             outcomes: A callable returning `True` iff the outcome should be kept,
                 or a collection of outcomes to keep.
             invert: If set, the filter is inverted.
+            collapse: If set, a pool or deal child may merge the outcomes
+                dropped by this filter. See `keep_outcomes()`.
         """
 
         self._children = (child, )
-        self._invert = invert
         if callable(outcomes):
-            self._func = outcomes
+            func = outcomes
         else:
             target_set = frozenset(outcomes)
 
             def function(outcome: T) -> bool:
                 return outcome in target_set
 
-            self._func = function
+            func = function
+        self._filters = ((func, invert), )
+        self._collapse = collapse
+
+    @classmethod
+    def _new_raw(
+        cls, child: MultisetExpression[T],
+        filters: 'tuple[tuple[Callable[[T], bool], bool], ...]',
+        collapse: bool
+    ) -> 'MultisetFilterOutcomes[T]':
+        """Creates a filter that keeps only outcomes passing all of `filters`.
+
+        Args:
+            child: The child expression.
+            filters: A sequence of `(func, invert)` pairs as the constructor.
+            collapse: As the constructor.
+        """
+        self = super().__new__(cls)
+        self._children = (child, )
+        self._filters = filters
+        self._collapse = collapse
+        return self
 
     def _next_state(self, state, order, outcome, child_counts, source_counts,
                     arg_counts):
-        if bool(self._func(outcome)) != self._invert:
+        if all(
+                bool(func(outcome)) != invert
+                for func, invert in self._filters):
             count = child_counts[0]
         else:
             count = 0
         return None, count
 
+    def _rewrite(self, children):
+        child, = children
+        filters = self._filters
+        if isinstance(child, MultisetFilterOutcomes):
+            filters = child._filters + filters
+            child = child._children[0]
+        if self._collapse and isinstance(child, icepool.KeepGenerator):
+            # The counts of dropped outcomes are discarded anyway, so the
+            # generator can merge them to reduce the number of outcomes.
+            # This changes the outcomes seen by the evaluator, so it is opt-in.
+            child = child._collapse_outcomes(lambda outcome: all(
+                bool(func(outcome)) != invert for func, invert in filters))
+        if child is self._children[0] and filters is self._filters:
+            return self
+        return MultisetFilterOutcomes._new_raw(child, filters, self._collapse)
+
     @property
     def _expression_key(self):
-        return type(self), self._func, self._invert
+        return type(self), self._filters, self._collapse
+
+    @property
+    def _stateless(self) -> bool:
+        return True
 
     def __str__(self) -> str:
-        if self._invert:
-            return f'{self._children[0]}.drop_outcomes(...)'
-        else:
-            return f'{self._children[0]}.keep_outcomes(...)'
+        result = str(self._children[0])
+        for func, invert in self._filters:
+            if invert:
+                result += '.drop_outcomes(...)'
+            else:
+                result += '.keep_outcomes(...)'
+        return result
 
 
 class MultisetFilterOutcomesBinary(MultisetOperator[T]):
@@ -83,8 +133,6 @@ class MultisetFilterOutcomesBinary(MultisetOperator[T]):
             outcomes: An expression of outcomes to keep if they have positive count.
             invert: If set, the filter is inverted.
         """
-        self._source = source
-        self._outcomes = outcomes
         self._children = (source, outcomes)
         self._invert = invert
 
@@ -101,8 +149,13 @@ class MultisetFilterOutcomesBinary(MultisetOperator[T]):
     def _expression_key(self):
         return type(self), self._invert
 
+    @property
+    def _stateless(self) -> bool:
+        return True
+
     def __str__(self) -> str:
+        source, outcomes = self._children
         if self._invert:
-            return f'{self._source}.drop_outcomes({self._outcomes})'
+            return f'{source}.drop_outcomes({outcomes})'
         else:
-            return f'{self._source}.keep_outcomes({self._outcomes})'
+            return f'{source}.keep_outcomes({outcomes})'
@@ -151,6 +151,19 @@ class MultisetKeep(MultisetOperator[T]):
         keep_tuple = keep_tuple[child_count:]
         return (keep_tuple, keep_more), count
 
+    def _rewrite(self, children):
+        child, = children
+        # Each element of a generator with a keep_tuple of zeros and ones
+        # counts once, so the keep can be composed into the keep_tuple.
+        # KeepGenerator.keep accepts more kinds of index than this operator,
+        # so only indexes that this operator also accepts are composed;
+        # others are left to raise as usual.
+        if isinstance(child, icepool.KeepGenerator) and all(
+                x in (0, 1)
+                for x in child.keep_tuple()) and _is_valid_index(self._index):
+            return child.keep(self._index)
+        return self._replace_children(children)
+
     @property
     def _expression_key(self):
         return MultisetKeep, self._index
@@ -162,3 +175,21 @@ class MultisetKeep(MultisetOperator[T]):
     def __str__(self) -> str:
         child = self._children[0]
         return f'{child}[{self._index}]'
+
+
+def _is_valid_index(index: 'slice | Sequence[int | EllipsisType]') -> bool:
+    """Whether `MultisetKeep` accepts the index regardless of size."""
+    if isinstance(index, slice):
+        return index.step is None
+    elif isinstance(index, Sequence):
+        if len(index) == 0:
+            return False
+        if index[0] is ...:
+            rest = index[1:]
+        elif index[-1] is ...:
+            rest = index[:-1]
+        else:
+            return False
+        return ... not in rest
+    else:
+        return False
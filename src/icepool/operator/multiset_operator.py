@@ -4,6 +4,7 @@ import icepool
 from icepool.expression.multiset_expression_base import BodyDungeonlet, BodyQuestlet, Dungeonlet, Questlet, MultisetSourceBase
 from icepool.expression.multiset_expression import MultisetExpression
 
+import copy
 import itertools
 import math
 
@@ -84,10 +85,47 @@ class MultisetOperator(MultisetExpression[T]):
     def _static_keepable(self) -> bool:
         return False
 
+    @property
+    def _stateless(self) -> bool:
+        """Whether `_initial_state` and `_next_state` always produce a `None` state.
+
+        If so, the state is left out of the evaluation state entirely.
+        Defaults to `False`.
+        """
+        return False
+
     @property
     def _has_parameter(self) -> bool:
         return any(child._has_parameter for child in self._children)
 
+    def _optimize(self) -> 'MultisetExpression[T]':
+        return self._rewrite(
+            tuple(child._optimize() for child in self._children))
+
+    def _rewrite(
+        self, children: 'tuple[MultisetExpression[T], ...]'
+    ) -> 'MultisetExpression[T]':
+        """Optional: fuses this node with its already-optimized children.
+
+        Args:
+            children: The optimized versions of `self._children`.
+
+        Returns:
+            An expression equivalent to this node with the given children.
+            Defaults to this node with only the children replaced.
+        """
+        return self._replace_children(children)
+
+    def _replace_children(
+        self, children: 'tuple[MultisetExpression[T], ...]'
+    ) -> 'MultisetExpression[T]':
+        """A copy of this node with the given children."""
+        if all(new is old for new, old in zip(children, self._children)):
+            return self
+        result = copy.copy(self)
+        result._children = children
+        return result
+
     def _prepare(
         self
     ) -> Iterator[tuple['tuple[Dungeonlet[T, Any], ...]',
@@ -111,8 +149,11 @@ class MultisetOperator(MultisetExpression[T]):
             child_indexes = tuple(p - positions[-1] - 1 for p in positions)
             dungeonlet = BodyDungeonlet[T, int](self._next_state,
                                                 self._dungeonlet_key,
-                                                child_indexes)
-            questlet = BodyQuestlet[T, int](self._initial_state, child_indexes)
+                                                child_indexes,
+                                                stateless=self._stateless)
+            questlet = BodyQuestlet[T, int](self._initial_state,
+                                            child_indexes,
+                                            stateless=self._stateless)
             dungeonlets.append(dungeonlet)
             questlets.append(questlet)
 
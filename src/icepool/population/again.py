@@ -1,11 +1,14 @@
 __docformat__ = 'google'
 
 import icepool
+from icepool.collection.counts import Counts
+from icepool.math import weighted_lcm
 
+from collections import defaultdict
 from functools import cache, cached_property
 import operator
 
-from typing import Any, Callable, Mapping, Sequence
+from typing import Any, Callable, Collection, Mapping, MutableMapping, Sequence
 
 from icepool.typing import MaybeHashKeyed, T
 
@@ -279,6 +282,17 @@ def evaluate_agains_using_count(
     if again_end is not icepool.Restart:
         again_end_die: icepool.Die[T] = icepool.Die([again_end])
 
+    kind_dice = again_kind_dice(outcomes, times, not_again_die, zero)
+    # The general path tracks the running total of the `Again` rolls, which is
+    # only worthwhile to avoid if some kind of `Again` roll has more than one
+    # possible value. `Restart` normalizes over the whole sequence of rolls,
+    # which the kind-count path does not reproduce, so it always uses the
+    # general path.
+    if again_end is not icepool.Restart and kind_dice is not None and any(
+            len(die) > 1 for kind, (die, _) in kind_dice.items() if kind > 0):
+        return evaluate_agains_using_kinds(kind_dice, again_count, again_end,
+                                           zero)
+
     def make_step_outcome(outcome):
         """add_flat, add_not_again, add_again"""
         if isinstance(outcome, AgainExpression):
@@ -328,6 +342,110 @@ def evaluate_agains_using_count(
     return final_state.map(finalize, star=True)
 
 
+def again_kind_dice(
+    outcomes:
+    'Sequence[T | icepool.Die[T] | icepool.RerollType | AgainExpression]',
+    times: Sequence[int], not_again_die: 'icepool.Die[T]', zero: T
+) -> 'Mapping[int, tuple[icepool.Die[T], int]] | None':
+    """Groups the rolls of an `again_count` process by how many new rolls they queue.
+
+    Since `+` is assumed to be associative and commutative, the result only
+    depends on how many rolls of each kind were made, and each roll's value
+    is independent of everything else given its kind.
+
+    Returns:
+        A mapping from the number of new rolls queued to the distribution of
+        the value added by such a roll and the total quantity of such rolls,
+        or `None` if some `AgainExpression` doesn't queue a fixed number of
+        rolls.
+    """
+    # kind -> (values, quantities)
+    kind_data: MutableMapping[int, tuple[list, list[int]]] = defaultdict(
+        lambda: ([], []))
+    not_again_quantity = 0
+    for outcome, quantity in zip(outcomes, times):
+        if isinstance(outcome, AgainExpression):
+            if not outcome.is_additive:
+                raise ValueError(
+                    'again_count mode cannot be used with a non-additive AgainExpression.'
+                )
+            kind = outcome._again_count()
+            if not isinstance(kind, int):
+                return None
+            values, quantities = kind_data[kind]
+            values.append(outcome._evaluate(zero))
+            quantities.append(quantity)
+        else:
+            # As with the general path, the value of a roll that doesn't
+            # queue any further rolls is drawn from `not_again_die`.
+            not_again_quantity += quantity
+    if not_again_quantity > 0:
+        values, quantities = kind_data[0]
+        values.append(not_again_die)
+        quantities.append(not_again_quantity)
+    return {
+        kind: (icepool.Die(values, quantities), sum(quantities))
+        for kind, (values, quantities) in kind_data.items()
+        if sum(quantities) > 0
+    }
+
+
+def evaluate_agains_using_kinds(
+        kind_dice: 'Mapping[int, tuple[icepool.Die[T], int]]',
+        again_count: int,
+        again_end: 'T | icepool.Die[T] | icepool.RerollType', zero: T
+) -> 'icepool.Die[T]':
+    """Fast path for `evaluate_agains_using_count`.
+
+    Rather than tracking the running total, the Markov process only tracks how
+    many rolls of each kind were made. The total is then computed once per
+    final state using `@`.
+
+    Args:
+        kind_dice: As returned from `again_kind_dice()`.
+        again_count: The maximum number of extra rolls.
+        again_end: As `evaluate_agains_using_count`, but with `None` and
+            `Reroll` already resolved.
+        zero: The zero outcome.
+    """
+    kinds = sorted(kind_dice.keys())
+    limit = again_count + 1
+
+    def pending(counts: tuple[int, ...]) -> int:
+        return 1 + sum((kind - 1) * n for kind, n in zip(kinds, counts))
+
+    def step(counts: tuple[int, ...], kind_index: int):
+        index = sum(counts)
+        if pending(counts) == 0 or index >= limit:
+            return counts
+        counts = counts[:kind_index] + (
+            counts[kind_index] + 1, ) + counts[kind_index + 1:]
+        if again_end is icepool.Restart:
+            if index + 1 + pending(counts) > limit:
+                return icepool.Restart
+        return counts
+
+    kind_index_die: icepool.Die[int] = icepool.Die(
+        {i: kind_dice[kind][1]
+         for i, kind in enumerate(kinds)})
+    initial_state: icepool.Die[tuple[int, ...]] = icepool.Die([(0, ) *
+                                                               len(kinds)])
+    final_state = initial_state.map(step,
+                                    kind_index_die,
+                                    star=False,
+                                    repeat=limit)
+
+    def finalize(counts: tuple[int, ...]):
+        result: icepool.Die[T] = icepool.Die([zero])
+        for kind, n in zip(kinds, counts):
+            result = result + n @ kind_dice[kind][0]
+        if again_end is not icepool.Restart:
+            result = result + pending(counts) @ icepool.Die([again_end])
+        return result
+
+    return final_state.map(finalize, star=False)
+
+
 def evaluate_agains_using_depth(
     outcomes:
     'Sequence[T | icepool.Die[T] | icepool.RerollType | AgainExpression]',
@@ -358,3 +476,48 @@ def evaluate_agains_using_depth(
     for _ in range(again_depth):
         tail = icepool.Die(outcomes, times, again_depth=0, again_end=tail)
     return tail
+
+
+def evaluate_explode_using_depth(die: 'icepool.Die[T]',
+                                 explode_outcomes: Collection[T],
+                                 again_depth: int,
+                                 tail: 'icepool.Die[T]') -> 'icepool.Die[T]':
+    """Fast path for `evaluate_agains_using_depth` where each exploding outcome maps to `outcome + Again`.
+
+    Rather than running the `Die` constructor once per depth, each depth is
+    computed directly as the weighted sum of the non-exploding outcomes and
+    shifted copies of the previous depth. Only the final result is sorted.
+
+    Args:
+        die: The die being exploded.
+        explode_outcomes: The outcomes that explode.
+        again_depth: The number of depths to add on top of `tail`.
+        tail: The result for `again_depth=0`.
+    """
+    if again_depth < 0:
+        raise ValueError('again_depth cannot be negative.')
+
+    data: Mapping[T, int] = tail
+    denominator = tail.denominator()
+    is_exploding = [outcome in explode_outcomes for outcome in die.outcomes()]
+
+    for _ in range(again_depth):
+        # Same weighting as the `Die` constructor would apply.
+        scale_factors = weighted_lcm(
+            [denominator if explodes else 1 for explodes in is_exploding],
+            die.quantities())
+        next_data: MutableMapping[T, int] = defaultdict(int)
+        for outcome, explodes, scale_factor in zip(die.outcomes(),
+                                                    is_exploding,
+                                                    scale_factors):
+            if scale_factor == 0:
+                continue
+            if explodes:
+                for tail_outcome, quantity in data.items():
+                    next_data[outcome + tail_outcome] += quantity * scale_factor  # type: ignore
+            else:
+                next_data[outcome] += scale_factor
+        data = next_data
+        denominator = sum(data.values())
+
+    return icepool.Die._new_raw(Counts(data.items()))
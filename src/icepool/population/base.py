@@ -18,7 +18,7 @@ import numbers
 import operator
 import random
 
-from typing import Any, Callable, Collection, Generic, Hashable, Iterator, Literal, Mapping, MutableMapping, Sequence, Set, Sized, TypeVar, cast, overload
+from typing import Any, Callable, Collection, Generic, Hashable, Iterable, Iterator, Literal, Mapping, MutableMapping, Sequence, Set, Sized, TypeVar, cast, overload
 
 C = TypeVar('C', bound='Population')
 """Type variable representing a subclass of `Population`."""
@@ -86,6 +86,19 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
                     return None
         return result
 
+    @cached_property
+    def _columns(self) -> tuple[tuple, ...] | None:
+        """The outcomes transposed into one tuple per dimension.
+
+        This is `None` unless all outcomes are tuples or `Vector`s of the same
+        length.
+        """
+        if self._common_outcome_length is None or not all(
+                isinstance(outcome, (tuple, Vector))
+                for outcome in self.outcomes()):
+            return None
+        return tuple(zip(*self.outcomes()))
+
     def common_outcome_length(self) -> int | None:
         """The common length of all outcomes.
 
@@ -123,27 +136,27 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             case '<=':
                 if outcome in self:
                     return outcome
-                index = bisect.bisect_right(self.outcomes(), outcome) - 1
+                index = bisect.bisect_right(self._outcomes_tuple, outcome) - 1
                 if index < 0:
                     return None
-                return self.outcomes()[index]
+                return self._outcomes_tuple[index]
             case '<':
-                index = bisect.bisect_left(self.outcomes(), outcome) - 1
+                index = bisect.bisect_left(self._outcomes_tuple, outcome) - 1
                 if index < 0:
                     return None
-                return self.outcomes()[index]
+                return self._outcomes_tuple[index]
             case '>=':
                 if outcome in self:
                     return outcome
-                index = bisect.bisect_left(self.outcomes(), outcome)
+                index = bisect.bisect_left(self._outcomes_tuple, outcome)
                 if index >= len(self):
                     return None
-                return self.outcomes()[index]
+                return self._outcomes_tuple[index]
             case '>':
-                index = bisect.bisect_right(self.outcomes(), outcome)
+                index = bisect.bisect_right(self._outcomes_tuple, outcome)
                 if index >= len(self):
                     return None
-                return self.outcomes()[index]
+                return self._outcomes_tuple[index]
             case _:
                 raise ValueError(f'Invalid comparison {comparison}')
 
@@ -211,16 +224,18 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
                 return self.get(outcome, 0)
             case '!=':
                 return self.denominator() - self.get(outcome, 0)
-            case '<=' | '<':
-                threshold = self.nearest(comparison, outcome)
-                if threshold is None:
-                    return 0
-                else:
-                    return self._cumulative_quantities[threshold]
+            case '<=':
+                index = bisect.bisect_right(self._outcomes_tuple, outcome)
+                return self._quantities_le[index - 1] if index > 0 else 0
+            case '<':
+                index = bisect.bisect_left(self._outcomes_tuple, outcome)
+                return self._quantities_le[index - 1] if index > 0 else 0
             case '>=':
-                return self.denominator() - self.quantity('<', outcome)
+                index = bisect.bisect_left(self._outcomes_tuple, outcome)
+                return self._quantities_ge[index] if index < len(self) else 0
             case '>':
-                return self.denominator() - self.quantity('<=', outcome)
+                index = bisect.bisect_right(self._outcomes_tuple, outcome)
+                return self._quantities_ge[index] if index < len(self) else 0
             case _:
                 raise ValueError(f'Invalid comparison {comparison}')
 
@@ -277,31 +292,35 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             case '==':
                 return self.values()
             case '<=':
-                return tuple(itertools.accumulate(self.values()))
+                return self._quantities_le
             case '>=':
-                return tuple(
-                    itertools.accumulate(self.values()[:-1],
-                                         operator.sub,
-                                         initial=self.denominator()))
+                return self._quantities_ge
             case '!=':
                 return tuple(self.denominator() - q for q in self.values())
             case '<':
                 return tuple(self.denominator() - q
-                             for q in self.quantities('>='))
+                             for q in self._quantities_ge)
             case '>':
                 return tuple(self.denominator() - q
-                             for q in self.quantities('<='))
+                             for q in self._quantities_le)
             case _:
                 raise ValueError(f'Invalid comparison {comparison}')
 
     @cached_property
-    def _cumulative_quantities(self) -> Mapping[T_co, int]:
-        result = {}
-        cdf = 0
-        for outcome, quantity in self.items():
-            cdf += quantity
-            result[outcome] = cdf
-        return result
+    def _quantities_le(self) -> tuple[int, ...]:
+        return tuple(itertools.accumulate(self.values()))
+
+    @cached_property
+    def _quantities_ge(self) -> tuple[int, ...]:
+        return tuple(
+            itertools.accumulate(self.values()[:-1],
+                                 operator.sub,
+                                 initial=self.denominator()))
+
+    @cached_property
+    def _outcomes_tuple(self) -> tuple[T_co, ...]:
+        """The outcomes as a plain tuple, which is faster to `bisect`."""
+        return tuple(self.outcomes())
 
     @cached_property
     def _denominator(self) -> int:
@@ -630,15 +649,15 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
 
     def quantile_low(self, n: int, d: int = 100) -> T_co:
         """The outcome `n / d` of the way through the CDF, taking the lesser in case of a tie."""
-        index = bisect.bisect_left(self.quantities('<='),
+        index = bisect.bisect_left(self._quantities_le,
                                    (n * self.denominator() + d - 1) // d)
         if index >= len(self):
             return self.max_outcome()
-        return self.outcomes()[index]
+        return self._outcomes_tuple[index]
 
     def quantile_high(self, n: int, d: int = 100) -> T_co:
         """The outcome `n / d` of the way through the CDF, taking the greater in case of a tie."""
-        index = bisect.bisect_right(self.quantities('<='),
+        index = bisect.bisect_right(self._quantities_le,
                                     n * self.denominator() // d)
         if index >= len(self):
             return self.max_outcome()
@@ -659,6 +678,35 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             sum(outcome * quantity for outcome, quantity in self.items()),
             self.denominator())
 
+    @cached_property
+    def _power_sums(self) -> tuple[Any, Any, Any, Any] | None:
+        """The sums of `quantity * outcome**k` for `k` from 1 to 4.
+
+        These are computed in a single pass and shared by `variance()` and
+        `standardized_moment()`. They are only computed for rational outcomes,
+        for which they are exact; otherwise this is `None`, and the callers
+        use the direct formulas, which raise on overflow rather than
+        producing `inf`.
+        """
+        if not all(
+                isinstance(outcome, numbers.Rational)
+                for outcome in self.outcomes()):
+            return None
+        s1: Any = 0
+        s2: Any = 0
+        s3: Any = 0
+        s4: Any = 0
+        for outcome, quantity in self.items():
+            x = outcome * quantity
+            s1 += x
+            x = x * outcome
+            s2 += x
+            x = x * outcome
+            s3 += x
+            x = x * outcome
+            s4 += x
+        return s1, s2, s3, s4
+
     @overload
     def variance(self: 'Population[numbers.Rational]') -> Fraction:
         ...
@@ -672,9 +720,13 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
     ) -> Fraction | float:
         """This is the population variance, not the sample variance."""
         mean = self.mean()
-        mean_of_squares = try_fraction(
-            sum(quantity * outcome**2 for outcome, quantity in self.items()),
-            self.denominator())
+        power_sums = self._power_sums
+        if power_sums is None:
+            sum_of_squares = sum(quantity * outcome**2
+                                 for outcome, quantity in self.items())
+        else:
+            sum_of_squares = power_sums[1]
+        mean_of_squares = try_fraction(sum_of_squares, self.denominator())
         return mean_of_squares - mean * mean
 
     def standard_deviation(
@@ -688,8 +740,20 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             k: int) -> float:
         sd = self.standard_deviation()
         mean = self.mean()
-        ev = sum(p * (outcome - mean)**k  # type: ignore 
-                 for outcome, p in zip(self.outcomes(), self.probabilities()))
+        power_sums = self._power_sums
+        if 0 <= k <= 4 and power_sums is not None:
+            # Expand the central moment in terms of the raw moments, which is
+            # exact for rational outcomes.
+            raw_moments = (Fraction(1), ) + tuple(
+                Fraction(x, self.denominator()) for x in power_sums)
+            ev = sum(
+                math.comb(k, j) * raw_moments[j] *
+                (-mean)**(k - j)  # type: ignore
+                for j in range(k + 1))
+        else:
+            ev = sum(
+                p * (outcome - mean)**k  # type: ignore 
+                for outcome, p in zip(self.outcomes(), self.probabilities()))
         return ev / (sd**k)
 
     def skewness(
@@ -707,8 +771,19 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             base: The logarithm base to use. Default is 2.0, which gives the 
                 entropy in bits.
         """
-        return -sum(p * math.log(p, base)
-                    for p in self.probabilities() if p > 0.0)
+        return self._entropy / math.log(base)
+
+    @cached_property
+    def _entropy(self) -> float:
+        """The entropy in nats."""
+        denominator = self.denominator()
+        if denominator == 0:
+            return 0.0
+        log_denominator = math.log(denominator)
+        # Integer true division and math.log are both safe for large ints.
+        return -sum((quantity / denominator) *
+                    (math.log(quantity) - log_denominator)
+                    for quantity in self.values() if quantity > 0)
 
     # Joint statistics.
 
@@ -722,10 +797,20 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
 
         def __len__(self) -> int:
             """The minimum len() of all outcomes."""
+            columns = self._population._columns
+            if columns is not None:
+                return len(columns)
             return min(len(x) for x in self._population.outcomes())
 
         def __getitem__(self, dims: int | slice, /):
             """Marginalizes the given dimensions."""
+            columns = self._population._columns
+            if columns is not None and isinstance(dims, int):
+                data: MutableMapping[Any, int] = defaultdict(int)
+                for x, quantity in zip(columns[dims],
+                                       self._population.values()):
+                    data[x] += quantity
+                return self._population._new_type(data)
             return self._population._unary_operator(operator.getitem, dims)
 
         def __iter__(self) -> Iterator:
@@ -764,20 +849,40 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             self:
         'Population[tuple[numbers.Rational, ...]] | Population[tuple[float, ...]]',
             i: int, j: int) -> Fraction | float:
-        mean_i = self.marginals[i].mean()
-        mean_j = self.marginals[j].mean()
+        column_i, column_j = self._column(i), self._column(j)
+        quantities = self.values()
+        denominator = self.denominator()
+        sum_i = sum(x * quantity for x, quantity in zip(column_i, quantities))
+        sum_j = sum(y * quantity for y, quantity in zip(column_j, quantities))
+        if isinstance(sum_i, numbers.Rational) and isinstance(
+                sum_j, numbers.Rational):
+            # Exact, and avoids a Fraction per outcome.
+            sum_ij = sum(x * y * quantity
+                         for x, y, quantity in zip(column_i, column_j,
+                                                   quantities))
+            return Fraction(sum_ij * denominator - sum_i * sum_j,
+                            denominator * denominator)
+        mean_i = try_fraction(sum_i, denominator)
+        mean_j = try_fraction(sum_j, denominator)
         return try_fraction(
-            sum((outcome[i] - mean_i) * (outcome[j] - mean_j) * quantity
-                for outcome, quantity in self.items()), self.denominator())
+            sum((x - mean_i) * (y - mean_j) * quantity
+                for x, y, quantity in zip(column_i, column_j, quantities)),
+            denominator)
 
     def correlation(
             self:
         'Population[tuple[numbers.Rational, ...]] | Population[tuple[float, ...]]',
             i: int, j: int) -> float:
-        sd_i = self.marginals[i].standard_deviation()
-        sd_j = self.marginals[j].standard_deviation()
+        sd_i = math.sqrt(self.covariance(i, i))
+        sd_j = math.sqrt(self.covariance(j, j))
         return self.covariance(i, j) / (sd_i * sd_j)
 
+    def _column(self, i: int) -> Sequence:
+        """The `i`th element of each outcome."""
+        if self._columns is not None:
+            return self._columns[i]
+        return [outcome[i] for outcome in self.outcomes()]
+
     # Transformations.
 
     def _select_outcomes(self, which: Callable[..., bool] | Collection[T_co],
@@ -885,10 +990,16 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
             else:
                 key_function = lambda o: key_map.get(o, o)
 
+            return self._group(
+                key_function(outcome)
+                for outcome in self._population.outcomes())
+
+        def _group(self, keys: Iterable[U]) -> Mapping[U, C]:
+            """Groups the outcomes by the corresponding keys."""
             result_datas: MutableMapping[U, MutableMapping[Any, int]] = {}
             outcome: Any
-            for outcome, quantity in self._population.items():
-                key = key_function(outcome)
+            for key, (outcome, quantity) in zip(keys,
+                                                self._population.items()):
                 if key not in result_datas:
                     result_datas[key] = defaultdict(int)
                 result_datas[key][outcome] += quantity
@@ -899,6 +1010,9 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
 
         def __getitem__(self, dims: int | slice, /):
             """Marginalizes the given dimensions."""
+            columns = self._population._columns
+            if columns is not None and isinstance(dims, int):
+                return self._group(columns[dims])
             return self(lambda x: x[dims])
 
         def __getattr__(self, key: str):
@@ -959,19 +1073,104 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
         """
         return Population._GroupBy(self)
 
-    def sample(self) -> T_co:
-        """A single random sample from this population.
+    @overload
+    def sample(self, n: None = None, /, *, rng=None) -> T_co:
+        ...
+
+    @overload
+    def sample(self, n: int, /, *, rng=None) -> list[T_co]:
+        ...
+
+    def sample(self, n: int | None = None, /, *, rng=None) -> T_co | list[T_co]:
+        """Random samples from this population.
 
         Note that this is always "with replacement" even for `Deck` since
         instances are immutable.
 
-        This uses the standard `random` package and is not cryptographically
-        secure.
+        This is not cryptographically secure.
+
+        Args:
+            n: The number of samples to draw. If not provided, a single outcome
+                is returned; otherwise, a list of `n` outcomes is returned.
+            rng: The source of randomness. One of the following:
+                * `None`: The standard `random` module.
+                * A `random.Random` instance. Seed it for reproducible results.
+                * A `numpy.random.Generator`, e.g.
+                    `numpy.random.default_rng(seed)`. In this case the draws
+                    are vectorized, which is much faster for large `n`.
         """
+        outcomes = self.outcomes()
+        if n is None:
+            return outcomes[self._sample_indexes(1, rng)[0]]
+        if n < 0:
+            raise ValueError('n cannot be negative.')
+        return [outcomes[i] for i in self._sample_indexes(n, rng)]
+
+    @cached_property
+    def _alias_table(self) -> tuple[tuple[int, ...], tuple[int, ...]]:
+        """Walker's alias table for O(1) sampling, using Vose's construction.
+
+        To sample, pick an index `i` uniformly and `r` uniformly from
+        `range(denominator)`. The result is `i` if `r < thresholds[i]` and
+        `aliases[i]` otherwise. All arithmetic is on exact integers.
+
+        Returns:
+            thresholds, aliases
+        """
+        denominator = self.denominator()
+        # Each index has a total weight of denominator.
+        scaled = [quantity * len(self) for quantity in self.values()]
+        thresholds = [denominator] * len(self)
+        aliases = list(range(len(self)))
+        small = [i for i, x in enumerate(scaled) if x < denominator]
+        large = [i for i, x in enumerate(scaled) if x >= denominator]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            thresholds[s] = scaled[s]
+            aliases[s] = l
+            scaled[l] -= denominator - scaled[s]
+            if scaled[l] < denominator:
+                small.append(l)
+            else:
+                large.append(l)
+        # Anything left over has exactly denominator weight.
+        return tuple(thresholds), tuple(aliases)
+
+    def _sample_indexes(self, n: int, rng, /) -> Sequence[int]:
+        """Draws `n` random indexes into `self.outcomes()`."""
+        denominator = self.denominator()
+        if denominator == 0:
+            raise ValueError('Cannot sample from an empty population.')
+        quantities_le = self.quantities('<=')
+        if rng is None:
+            rng = random
+        elif hasattr(rng, 'integers'):
+            # numpy.random.Generator.
+            if len(self) * denominator <= 2**63 - 1:
+                import numpy
+                thresholds, aliases = self._alias_table
+                indexes, r = numpy.divmod(
+                    rng.integers(len(self) * denominator, size=n),
+                    denominator)
+                return numpy.where(r < numpy.asarray(thresholds)[indexes],
+                                   indexes,
+                                   numpy.asarray(aliases)[indexes]).tolist()
+            elif denominator <= 2**63 - 1:
+                import numpy
+                r = rng.integers(denominator, size=n)
+                return numpy.searchsorted(numpy.asarray(quantities_le),
+                                          r,
+                                          side='right').tolist()
+            else:
+                # Too large for int64; seed a Python generator instead.
+                rng = random.Random(int(rng.integers(2**63 - 1)))
         # We don't use random.choices since that is based on floats rather than ints.
-        r = random.randrange(self.denominator())
-        index = bisect.bisect_right(self.quantities('<='), r)
-        return self.outcomes()[index]
+        # In pure Python, bisect outperforms the alias table.
+        return [
+            bisect.bisect_right(quantities_le, rng.randrange(denominator))
+            for _ in range(n)
+        ]
 
     def format(self, format_spec: str, /, **kwargs) -> str:
         """Formats this mapping as a string.
@@ -1000,6 +1199,24 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
         the probabilities. The quantities are omitted from the default columns 
         if any individual quantity is 10**30 or greater.
         """
+        return ''.join(self.format_lines(format_spec, **kwargs))
+
+    def format_lines(self, format_spec: str, /, **kwargs) -> Iterator[str]:
+        """Formats this mapping as an iterator of lines.
+
+        Each line includes its trailing newline. This is equivalent to
+        `format()`, but the rows are generated one at a time rather than
+        being held in memory all at once, which is useful for writing large
+        populations to a file:
+
+        ```python
+        with open('die.csv', 'w', newline='') as f:
+            f.writelines(die.format_lines('csv'))
+        ```
+
+        Args:
+            format_spec: As `format()`.
+        """
         if not self.is_empty() and self.modal_quantity() < 10**30:
             default_column_spec = '*oq==%=='
         else:
@@ -1022,13 +1239,14 @@ class Population(ABC, Expandable[T_co], Mapping[Any, int]):
 
         match output_format:
             case 'md':
-                return icepool.population.format.markdown(self, col_spec)
+                return icepool.population.format.iter_markdown(self, col_spec)
             case 'bbcode':
-                return icepool.population.format.bbcode(self, col_spec)
+                return icepool.population.format.iter_bbcode(self, col_spec)
             case 'csv':
-                return icepool.population.format.csv(self, col_spec, **kwargs)
+                return icepool.population.format.iter_csv(
+                    self, col_spec, **kwargs)
             case 'html':
-                return icepool.population.format.html(self, col_spec)
+                return icepool.population.format.iter_html(self, col_spec)
             case _:
                 raise ValueError(
                     f"Unsupported output format '{output_format}'")
@@ -8,8 +8,10 @@ from icepool.collection.counts import Counts, CountsKeysView, CountsValuesView,
 from icepool.population.base import Population
 from icepool.typing import U, MaybeHashKeyed, T_co, infer_star
 
+import bisect
 import functools
 import operator
+import random
 
 from collections import Counter
 from functools import cached_property
@@ -116,6 +118,49 @@ class Deck(Population[T_co], MaybeHashKeyed):
         """A `Deck` with the max outcome removed."""
         return self._popped_max
 
+    def _sample_draws(self, n: int, k: int, rng, /) -> list[list[T_co]]:
+        """Draws `k` cards without replacement, `n` separate times.
+
+        Args:
+            n: The number of times to draw.
+            k: The number of cards to draw each time.
+            rng: The source of randomness, as `sample()`.
+
+        Returns:
+            A list of `n` lists of `k` cards each, in the order they were
+            drawn.
+        """
+        if k > self.size():
+            raise ValueError(
+                'The number of cards drawn cannot exceed the size of the deck.'
+            )
+        outcomes = self.outcomes()
+        quantities_le = self.quantities('<=')
+        if rng is None:
+            rng = random
+        elif hasattr(rng, 'integers'):
+            # numpy.random.Generator.
+            import numpy
+            # Floyd's algorithm, vectorized over samples, so that only `k`
+            # cards are drawn per sample rather than shuffling the whole deck.
+            size = self.size()
+            cards = numpy.empty((n, k), dtype=numpy.int64)
+            for i, j in enumerate(range(size - k, size)):
+                t = rng.integers(j + 1, size=n)
+                seen = (cards[:, :i] == t[:, None]).any(axis=1)
+                cards[:, i] = numpy.where(seen, j, t)
+            # Floyd's algorithm selects a uniform subset but not a uniform
+            # order.
+            cards = rng.permuted(cards, axis=1)
+            indexes = numpy.searchsorted(numpy.asarray(quantities_le),
+                                         cards,
+                                         side='right').tolist()
+            return [[outcomes[i] for i in row] for row in indexes]
+        return [[
+            outcomes[bisect.bisect_right(quantities_le, card)]
+            for card in rng.sample(range(self.size()), k)
+        ] for _ in range(n)]
+
     @overload
     def deal(self, hand_size: int, /) -> 'icepool.Deal[T_co]':
         ...
@@ -520,6 +520,26 @@ class Die(Population[T_co], MaybeHashKeyed):
                                     repeat=repeat,
                                     **kwargs)
 
+    def map_iter(
+            self,
+            repl:
+        'Callable[..., T_co | Die[T_co] | icepool.RerollType] | Mapping[T_co, T_co | Die[T_co] | icepool.RerollType]',
+            /,
+            *extra_args,
+            star: bool | None = None,
+            repeat: int | None = None,
+            **kwargs) -> 'Iterator[Die[T_co]]':
+        """EXPERIMENTAL: Repeatedly map outcomes of the state to other outcomes, yielding the state distribution at each time step.
+
+        As `map_iter(repl, self, ...)`.
+        """
+        return icepool.map_iter(repl,
+                                self,
+                                *extra_args,
+                                star=star,
+                                repeat=repeat,
+                                **kwargs)
+
     def mean_time_to_absorb(
             self,
             repl:
@@ -583,12 +603,19 @@ class Die(Population[T_co], MaybeHashKeyed):
         return result.map(get_time)
 
     @cached_property
-    def _mean_time_to_sum_cache(self) -> list[Fraction]:
-        return [Fraction(0)]
+    def _mean_time_to_sum_cache(self) -> list[int]:
+        """Scaled mean times to sum.
+
+        Element `t` is the mean time to sum to `t`, multiplied by
+        `(denominator - quantity(0)) ** t`. This is always an integer.
+        """
+        return [0]
 
     def mean_time_to_sum(self: 'Die[int]', target: int, /) -> Fraction:
         """The mean number of rolls until the cumulative sum is greater or equal to the target.
 
+        All targets up to `target` are computed in a single pass and cached.
+
         Args:
             target: The target sum.
 
@@ -597,23 +624,37 @@ class Die(Population[T_co], MaybeHashKeyed):
             ZeroDivisionError: If `self.mean() == 0`.
         """
         target = max(target, 0)
+        cache = self._mean_time_to_sum_cache
+        # Zeros are effectively rerolled.
+        effective_denominator = self.denominator() - self.quantity(0)
 
-        if target < len(self._mean_time_to_sum_cache):
-            return self._mean_time_to_sum_cache[target]
-
-        if self.min_outcome() < 0:
-            raise ValueError(
-                'mean_time_to_sum does not handle negative outcomes.')
-        time_per_effect = Fraction(self.denominator(),
-                                   self.denominator() - self.quantity(0))
-
-        for i in range(len(self._mean_time_to_sum_cache), target + 1):
-            result = time_per_effect + self.reroll([
-                0
-            ], depth='inf').map(lambda x: self.mean_time_to_sum(i - x)).mean()
-            self._mean_time_to_sum_cache.append(result)
-
-        return result
+        if target >= len(cache):
+            if self.min_outcome() < 0:
+                raise ValueError(
+                    'mean_time_to_sum does not handle negative outcomes.')
+            if effective_denominator == 0:
+                raise ZeroDivisionError(
+                    'mean_time_to_sum is not defined if all outcomes are zero.'
+                )
+            # Let E[t] be the mean time to sum to t, with E[t] = 0 for t <= 0.
+            # Then E[t] * effective_denominator
+            #   = denominator + sum_{x > 0} quantity(x) * E[t - x].
+            # Scaling both sides by effective_denominator ** (t - 1) gives a
+            # recurrence over integers.
+            weights = [(outcome,
+                        quantity * effective_denominator**(outcome - 1))
+                       for outcome, quantity in self.items() if outcome > 0]
+            scale = effective_denominator**(len(cache) - 1)
+            for t in range(len(cache), target + 1):
+                result = self.denominator() * scale
+                for outcome, weight in weights:
+                    if outcome >= t:
+                        break
+                    result += weight * cache[t - outcome]
+                cache.append(result)
+                scale *= effective_denominator
+
+        return Fraction(cache[target], effective_denominator**target)
 
     def explode(self,
                 outcomes: Collection[T_co] | Callable[..., bool] | None = None,
@@ -659,7 +700,9 @@ class Die(Population[T_co], MaybeHashKeyed):
             else:
                 return outcome
 
-        return self.map(map_final, again_depth=depth, again_end=end)
+        tail = self.map(map_final, again_depth=0, again_end=end)
+        return icepool.population.again.evaluate_explode_using_depth(
+            self, outcome_set, depth, tail)
 
     def if_else(
         self,
@@ -5,10 +5,12 @@ from icepool.population.base import Population
 import csv as csv_lib
 import html as html_lib
 import io
+import itertools
 import math
 import re
+from fractions import Fraction
 
-from typing import Sequence
+from typing import Callable, Iterator, Sequence
 
 OUTCOME_PATTERN = r'(?:\*o|o)'
 
@@ -17,6 +19,8 @@ COMPARATOR_PATTERN = f'(?:[%ipq](?:{COMPARATOR_OPTIONS}))'
 
 TOTAL_PATTERN = re.compile(f'(?:{OUTCOME_PATTERN}|{COMPARATOR_PATTERN})')
 
+NUMERIC_PATTERN = re.compile(r'-?\d+(\.\d*)?%?$')
+
 
 def format_probability_inverse(probability, /, int_start: int = 20):
     """EXPERIMENTAL: Formats the inverse of a value as "1 in N".
@@ -83,204 +87,231 @@ def make_headers(mapping: Population,
     return result
 
 
-def gather_cols(mapping: Population,
-                format_tokens: Sequence[str]) -> Sequence[Sequence]:
-    result: list[list[str]] = []
+def gather_cols(
+        mapping: Population,
+        format_tokens: Sequence[str]) -> Sequence[Callable[[], Iterator[str]]]:
+    """Generates the columns of the table.
+
+    Each column is a function that produces a fresh iterator over the cells of
+    that column, so that the cells can be traversed more than once without
+    holding all of them in memory.
+    """
+    result: list[Callable[[], Iterator[str]]] = []
     for token in format_tokens:
         if token == 'o':
-            result.append([str(x) for x in mapping.outcomes()])
+            result.append(lambda: (str(x) for x in mapping.outcomes()))
         elif token == '*o':
             r = mapping.common_outcome_length()
             if r is None:
-                result.append([str(x) for x in mapping.outcomes()])
+                result.append(lambda: (str(x) for x in mapping.outcomes()))
             else:
                 for i in range(r):
-                    result.append([str(x[i]) for x in mapping.outcomes()])
+                    result.append(lambda i=i:
+                                  (str(x[i]) for x in mapping.outcomes()))
         else:
             comparator = token[1:]
             denom_type = token[0]
-            col: Sequence
+            if comparator == '==':
+                col = mapping.quantities()
+            elif comparator == '<=':
+                col = mapping.quantities('<=')
+            elif comparator == '>=':
+                col = mapping.quantities('>=')
+            denominator = mapping.denominator()
             if denom_type == 'q':
-                if comparator == '==':
-                    col = list(mapping.values())
-                elif comparator == '<=':
-                    col = mapping.quantities('<=')
-                elif comparator == '>=':
-                    col = mapping.quantities('>=')
-                result.append([str(x) for x in col])
-            elif denom_type in ['p', '%', 'i']:
-                if mapping.denominator() == 0:
-                    result.append(['n/a' for x in mapping.outcomes()])
-                else:
-                    if comparator == '==':
-                        col = mapping.probabilities()
-                    elif comparator == '<=':
-                        col = mapping.probabilities('<=')
-                    elif comparator == '>=':
-                        col = mapping.probabilities('>=')
-
-                    if denom_type == 'p':
-                        result.append([f'{float(x):0.6f}' for x in col])
-                    elif denom_type == '%':
-                        result.append([f'{float(x):0.6%}' for x in col])
-                    elif denom_type == 'i':
-                        result.append(
-                            [format_probability_inverse(x) for x in col])
+                result.append(lambda col=col: (str(x) for x in col))
+            elif denominator == 0:
+                result.append(lambda: ('n/a' for x in mapping.outcomes()))
+            elif denom_type == 'p':
+                # Integer true division is correctly rounded.
+                result.append(lambda col=col:
+                              (f'{x / denominator:0.6f}' for x in col))
+            elif denom_type == '%':
+                result.append(lambda col=col:
+                              (f'{x / denominator:0.6%}' for x in col))
+            elif denom_type == 'i':
+                result.append(lambda col=col: (format_probability_inverse(
+                    Fraction(x, denominator)) for x in col))
     return result
 
 
-def make_rows(mapping: Population,
-              format_tokens: Sequence[str]) -> Sequence[Sequence[str]]:
-    cols = gather_cols(mapping, format_tokens)
-    return [[c for c in row_data] for row_data in zip(*cols)]
+def make_rows(
+        cols: Sequence[Callable[[], Iterator[str]]]) -> Iterator[tuple[str, ...]]:
+    """Lazily generates the rows of the table."""
+    return zip(*(col() for col in cols))
 
 
-def compute_col_widths(headers: Sequence[str],
-                       rows: Sequence[Sequence[str]]) -> Sequence[int]:
-    result = [len(s) for s in headers]
-    for row in rows:
-        result = [max(x, len(s)) for x, s in zip(result, row)]
-    return result
+def compute_col_widths(
+        headers: Sequence[str],
+        cols: Sequence[Callable[[], Iterator[str]]]) -> Sequence[int]:
+    return [
+        max(itertools.chain((len(header), ), (len(s) for s in col())))
+        for header, col in zip(headers, cols)
+    ]
 
 
-def compute_alignments(rows: Sequence[Sequence[str]]) -> Sequence[str]:
+def compute_alignments(
+        cols: Sequence[Callable[[], Iterator[str]]]) -> Sequence[str]:
     """A list of '<' or '>' for each column specifying alignment.
 
     Columns are aligned right iff all values are numeric.
     """
-    result: list[str] = ['>'] * len(rows[0])
-    for row in rows:
-        for i, cell in enumerate(row):
-            if not re.match(r'-?\d+(\.\d*)?%?$', cell):
-                result[i] = '<'
-    return result
+    return [
+        '>' if all(NUMERIC_PATTERN.match(cell) for cell in col()) else '<'
+        for col in cols
+    ]
 
 
-def markdown(population: Population, col_spec: str) -> str:
-    """Formats the Population as a Markdown table."""
+def iter_markdown(population: Population, col_spec: str) -> Iterator[str]:
+    """Formats the Population as a Markdown table, line by line."""
     if population.is_empty():
-        return f'Empty {type(population).__name__}\n'
+        yield f'Empty {type(population).__name__}\n'
+        return
 
     format_tokens = split_format_spec(col_spec)
 
     headers = make_headers(population, format_tokens)
-    rows = make_rows(population, format_tokens)
-    col_widths = compute_col_widths(headers, rows)
-    alignments = compute_alignments(rows)
+    cols = gather_cols(population, format_tokens)
+    col_widths = compute_col_widths(headers, cols)
+    alignments = compute_alignments(cols)
+
+    yield f'{type(population).__name__} with denominator {population.denominator()}\n'
+    yield '\n'
 
-    result = f'{type(population).__name__} with denominator {population.denominator()}\n\n'
-    result += '|'
+    line = '|'
     for header, alignment, col_width in zip(headers, alignments, col_widths):
-        result += f' {header:{alignment}{col_width}} |'
-    result += '\n'
+        line += f' {header:{alignment}{col_width}} |'
+    yield line + '\n'
 
-    result += '|'
+    line = '|'
     for alignment, col_width in zip(alignments, col_widths):
         if alignment == '<':
-            result += ':' + '-' * col_width + '-|'
+            line += ':' + '-' * col_width + '-|'
         else:
-            result += '-' + '-' * col_width + ':|'
-    result += '\n'
+            line += '-' + '-' * col_width + ':|'
+    yield line + '\n'
 
-    for row in rows:
-        result += '|'
+    for row in make_rows(cols):
+        line = '|'
         for s, alignment, col_width in zip(row, alignments, col_widths):
-            result += f' {s:{alignment}{col_width}} |'
-        result += '\n'
+            line += f' {s:{alignment}{col_width}} |'
+        yield line + '\n'
 
-    result += '\n'
+    yield '\n'
 
-    return result
 
-
-def csv(population: Population,
-        col_spec: str,
-        *,
-        dialect: str = 'excel',
-        **fmtparams) -> str:
-    """Formats the `Population` as a comma-separated-values table."""
+def iter_csv(population: Population,
+             col_spec: str,
+             *,
+             dialect: str = 'excel',
+             **fmtparams) -> Iterator[str]:
+    """Formats the `Population` as a comma-separated-values table, line by line."""
 
     format_tokens = split_format_spec(col_spec)
 
     headers = make_headers(population, format_tokens)
-    rows = make_rows(population, format_tokens)
+    cols = gather_cols(population, format_tokens)
 
     with io.StringIO() as out:
         writer = csv_lib.writer(out, dialect=dialect, **fmtparams)
-        writer.writerow(headers)
-        for row in rows:
+        for row in itertools.chain((headers, ), make_rows(cols)):
             writer.writerow(row)
-
-        return out.getvalue()
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
 
 
-def bbcode(population: Population, col_spec: str) -> str:
-    """Formats the `Population` as a BBCode table."""
+def iter_bbcode(population: Population, col_spec: str) -> Iterator[str]:
+    """Formats the `Population` as a BBCode table, line by line."""
     if population.is_empty():
-        return f'Empty {type(population).__name__}\n'
+        yield f'Empty {type(population).__name__}\n'
+        return
 
     format_tokens = split_format_spec(col_spec)
 
     headers = make_headers(population, format_tokens)
-    rows = make_rows(population, format_tokens)
-    alignments = compute_alignments(rows)
+    cols = gather_cols(population, format_tokens)
+    alignments = compute_alignments(cols)
 
-    result = f'{type(population).__name__} with denominator {population.denominator()}\n\n'
-    result += '[table]\n'
-    result += '[tr]'
+    yield f'{type(population).__name__} with denominator {population.denominator()}\n'
+    yield '\n'
+    yield '[table]\n'
+    line = '[tr]'
     for header, alignment in zip(headers, alignments):
         if alignment == '<':
-            result += f'[th]{header}[/th]'
+            line += f'[th]{header}[/th]'
         else:
-            result += f'[th][right]{header}[/right][/th]'
-    result += '[/tr]\n'
+            line += f'[th][right]{header}[/right][/th]'
+    yield line + '[/tr]\n'
 
-    for row in rows:
-        result += '[tr]'
+    for row in make_rows(cols):
+        line = '[tr]'
         for s, alignment in zip(row, alignments):
             if alignment == '<':
-                result += f'[td]{s}[/td]'
+                line += f'[td]{s}[/td]'
             else:
-                result += f'[td][right]{s}[/right][/td]'
-        result += '[/tr]\n'
+                line += f'[td][right]{s}[/right][/td]'
+        yield line + '[/tr]\n'
 
-    result += '[/table]\n'
+    yield '[/table]\n'
 
-    return result
 
-
-def html(population: Population, col_spec: str) -> str:
-    """Formats the `Population` as a HTML table."""
+def iter_html(population: Population, col_spec: str) -> Iterator[str]:
+    """Formats the `Population` as a HTML table, line by line."""
     if population.is_empty():
-        return f'Empty {type(population).__name__}\n'
+        yield f'Empty {type(population).__name__}\n'
+        return
 
     format_tokens = split_format_spec(col_spec)
 
     headers = make_headers(population, format_tokens)
-    rows = make_rows(population, format_tokens)
-    alignments = compute_alignments(rows)
+    cols = gather_cols(population, format_tokens)
+    alignments = compute_alignments(cols)
 
-    result = '<table>\n'
-    result += f'<caption>{type(population).__name__} with denominator {population.denominator()}</caption>\n'
-    result += '<tr>'
+    yield '<table>\n'
+    yield f'<caption>{type(population).__name__} with denominator {population.denominator()}</caption>\n'
+    line = '<tr>'
     for header, alignment in zip(headers, alignments):
         header = html_lib.escape(header)
         if alignment == '<':
-            result += f'<th>{header}</th>'
+            line += f'<th>{header}</th>'
         else:
-            result += f'<th style="text-align:right;">{header}</th>'
-    result += '</tr>\n'
+            line += f'<th style="text-align:right;">{header}</th>'
+    yield line + '</tr>\n'
 
-    for row in rows:
-        result += '<tr>'
+    for row in make_rows(cols):
+        line = '<tr>'
         for s, alignment in zip(row, alignments):
             s = html_lib.escape(s)
             if alignment == '<':
-                result += f'<td>{s}</td>'
+                line += f'<td>{s}</td>'
             else:
-                result += f'<td style="text-align:right;">{s}</td>'
-        result += '</tr>\n'
+                line += f'<td style="text-align:right;">{s}</td>'
+        yield line + '</tr>\n'
 
-    result += '</table>\n'
+    yield '</table>\n'
 
-    return result
+
+def markdown(population: Population, col_spec: str) -> str:
+    """Formats the Population as a Markdown table."""
+    return ''.join(iter_markdown(population, col_spec))
+
+
+def csv(population: Population,
+        col_spec: str,
+        *,
+        dialect: str = 'excel',
+        **fmtparams) -> str:
+    """Formats the `Population` as a comma-separated-values table."""
+    return ''.join(
+        iter_csv(population, col_spec, dialect=dialect, **fmtparams))
+
+
+def bbcode(population: Population, col_spec: str) -> str:
+    """Formats the `Population` as a BBCode table."""
+    return ''.join(iter_bbcode(population, col_spec))
+
+
+def html(population: Population, col_spec: str) -> str:
+    """Formats the `Population` as a HTML table."""
+    return ''.join(iter_html(population, col_spec))
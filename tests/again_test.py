@@ -119,3 +119,28 @@ def test_again_count_double_reroll():
                  again_end=icepool.Reroll)
     expected = d6.map({6: 6 + 2 @ d(5)})
     assert result == expected
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 5])
+def test_again_count_multiple_values(n):
+    count = Die([1, 2, 3, 4, 5 + Again, 6 + Again], again_count=n)
+    depth = d6.explode([5, 6], depth=n)
+    assert count.equals(depth, simplify=True)
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 5])
+def test_again_count_die_value(n):
+    count = Die([1, 2, 3, d6 + Again], again_count=n)
+    depth = Die([1, 2, 3, d6 + Again], again_depth=n)
+    assert count.equals(depth, simplify=True)
+
+
+@pytest.mark.parametrize('again_end', [None, Reroll, Restart, icepool.d4])
+@pytest.mark.parametrize('n', [0, 1, 3])
+def test_again_count_kinds_match_general(monkeypatch, again_end, n):
+    faces = [1, 2, 3, 4, d6 + Again, 6 + Again + Again]
+    fast = Die(faces, again_count=n, again_end=again_end)
+    monkeypatch.setattr(icepool.population.again, 'again_kind_dice',
+                        lambda *args: None)
+    general = Die(faces, again_count=n, again_end=again_end)
+    assert fast.equals(general)
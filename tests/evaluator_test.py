@@ -1,5 +1,6 @@
 import icepool
 import pytest
+import random
 
 from icepool import d4, d6, d8, d10, d12, Pool, Vector, Order, UnsupportedOrder
 from icepool.evaluator.multiset_function import multiset_function
@@ -232,3 +233,227 @@ def test_contains_subset_vs_intersection_size():
 def test_empty():
     result = (d6.pool(1) & d6.pool(1)).empty()
     assert result == (d6 != d6)
+
+
+def test_estimate_sum():
+    pool = d6.pool(5)[-2:] + d8.pool(1)
+    result = icepool.evaluator.sum_evaluator.estimate(
+        pool, samples=10000, rng=random.Random(0))
+    assert result.denominator() == 10000
+    assert result.mean() == pytest.approx(pool.sum().mean(), abs=0.2)
+
+
+def test_estimate_reroll():
+    result = SumRerollIfAnyOnes().estimate(d6.pool(2),
+                                           samples=1000,
+                                           rng=random.Random(0))
+    assert result.denominator() == 1000
+    assert result.min_outcome() >= 4
+
+
+def test_estimate_multi_deal():
+
+    @multiset_function
+    def union_size(hands):
+        a, b = hands
+        return (a | b).size()
+
+    deck = icepool.Deck(range(20))
+    result = union_size.estimate(deck.deal((5, 5)),
+                                 samples=100,
+                                 rng=random.Random(0))
+    assert result.probability(10) == 1
+
+
+def test_compiled_next_state_tree():
+
+    @multiset_function
+    def f(a, b):
+        return (a & b).size(), (a - b).keep_counts('>=', 2).unique().sum()
+
+    for dungeon, quest, sources, weight in f._prepare(
+        (d6.pool(3), d6.pool(2)), {}):
+        room, arg_sizes = dungeon.initial_room(quest, sources, Order.Ascending,
+                                               (1, 2, 3, 4, 5, 6), {})
+        for outcome in range(1, 7):
+            for source_counts in [(0, 0), (1, 0), (2, 1), (3, 2)]:
+                assert dungeon.next_state_tree(
+                    room.initial_statelet_tree, Order.Ascending, outcome,
+                    iter(source_counts),
+                    ()) == dungeon.dungeonlet_call_tree.next_state(
+                        room.initial_statelet_tree, Order.Ascending, outcome,
+                        iter(source_counts), ())
+
+
+def test_stateless_operators_elided():
+    expression = (d6.pool(3) - d6.pool(2)).keep_counts('>=', 2).unique()
+    for dungeon, quest, sources, weight in icepool.evaluator.sum_evaluator._prepare(
+        (expression, ), {}):
+        room, arg_sizes = dungeon.initial_room(quest, sources, Order.Ascending,
+                                               (1, 2, 3, 4, 5, 6), {})
+        assert room.initial_statelet_tree.flats == ((), )
+
+
+def test_memoize_transitions():
+    calls = 0
+
+    class CountingSumEvaluator(icepool.MultisetEvaluator):
+
+        @icepool.memoize_transitions
+        def next_state(self, state, order, outcome, count):
+            nonlocal calls
+            calls += 1
+            return (state or 0) + outcome * count
+
+        @property
+        def next_state_key(self):
+            return type(self)
+
+    next_state = CountingSumEvaluator.next_state
+    next_state.cache_clear()  # type: ignore
+    assert CountingSumEvaluator().evaluate(d6.pool(3)) == d6.pool(3).sum()
+    first_calls = calls
+    assert CountingSumEvaluator().evaluate(d6.pool(4)) == d6.pool(4).sum()
+    info = next_state.cache_info()  # type: ignore
+    assert info.misses == calls
+    assert info.hits > 0
+    assert calls - first_calls < first_calls
+
+
+def test_memoize_transitions_per_instance():
+
+    class SumEvaluator(icepool.MultisetEvaluator):
+
+        @icepool.memoize_transitions
+        def next_state(self, state, order, outcome, count):
+            return (state or 0) + outcome * count
+
+    next_state = SumEvaluator.next_state
+    next_state.cache_clear()  # type: ignore
+    assert SumEvaluator().evaluate(d6.pool(3)) == d6.pool(3).sum()
+    assert next_state.cache_info().currsize > 0  # type: ignore
+    next_state.cache_clear()  # type: ignore
+    assert next_state.cache_info().currsize == 0  # type: ignore
+
+
+def test_memoize_transitions_maxsize():
+
+    class SumEvaluator(icepool.MultisetEvaluator):
+
+        @icepool.memoize_transitions(maxsize=8)
+        def next_state(self, state, order, outcome, count):
+            return (state or 0) + outcome * count
+
+    next_state = SumEvaluator.next_state
+    assert SumEvaluator().evaluate(d6.pool(3)) == d6.pool(3).sum()
+    info = next_state.cache_info()  # type: ignore
+    assert info.maxsize == 8
+    assert info.currsize == 8
+
+
+def test_next_state_batch():
+    batch_calls = 0
+
+    class BatchSumEvaluator(icepool.MultisetEvaluator):
+
+        def initial_state(self, order, outcomes, size):
+            return 0
+
+        def next_state(self, state, order, outcome, count):
+            return state + outcome * count
+
+        def next_state_batch(self, states, order, outcome, count):
+            nonlocal batch_calls
+            batch_calls += 1
+            return {
+                state + outcome * count: weight
+                for state, weight in states.items()
+            }
+
+    pool = d6.pool(3) & d8.pool(4)
+    assert BatchSumEvaluator().evaluate(pool) == pool.sum()
+    assert batch_calls > 0
+
+
+@pytest.mark.parametrize('evaluator_type', [
+    icepool.evaluator.SumEvaluator, icepool.evaluator.SizeEvaluator,
+    icepool.evaluator.LargestCountEvaluator
+])
+def test_builtin_next_state_batch(evaluator_type):
+
+    class UnbatchedEvaluator(evaluator_type):
+
+        def next_state_batch(self, states, order, outcome, count):
+            return None
+
+    pool = d6.pool(3) & d8.pool(4)
+    assert evaluator_type().evaluate(pool) == UnbatchedEvaluator().evaluate(
+        pool)
+
+
+class AnyPairEvaluator(icepool.MultisetEvaluator):
+
+    def __init__(self, order, use_break):
+        self.order = order
+        self.use_break = use_break
+        self.calls = 0
+
+    def next_state(self, state, order, outcome, count):
+        self.calls += 1
+        if order != self.order:
+            raise UnsupportedOrder()
+        if count >= 2:
+            return icepool.Break(True) if self.use_break else True
+        return state or False
+
+
+@pytest.mark.parametrize('order', [Order.Ascending, Order.Descending])
+def test_break(order):
+    # keep-skip makes the unpreferred order use forward evaluation.
+    pool = d6.pool(6)[:-1]
+    with_break = AnyPairEvaluator(order, True)
+    without_break = AnyPairEvaluator(order, False)
+    assert with_break.evaluate(pool) == without_break.evaluate(pool)
+    assert with_break.calls < without_break.calls
+
+
+def test_break_joint():
+
+    @multiset_function
+    def f(a, b):
+        return a <= b, a.sum()
+
+    result = f(d4.pool(2), d4.pool(3))
+    expected = icepool.map(
+        lambda a, b: (all(a.count(x) <= b.count(x) for x in a), sum(a)),
+        d4.pool(2).expand(), d4.pool(3).expand())
+    assert result == expected
+
+
+def test_state_counts():
+    counts = icepool.evaluator.SumEvaluator().state_counts(d6.pool(2))
+    assert len(counts) == 7
+    assert counts[0] == 1
+    assert counts[-1] == len(d6.pool(2).sum())
+
+
+class UncanonicalizedStraightEvaluator(
+        icepool.evaluator.LargestStraightEvaluator):
+    canonicalize_state = icepool.MultisetEvaluator.canonicalize_state
+
+
+class AscendingStraightEvaluator(icepool.evaluator.LargestStraightEvaluator):
+
+    def next_state(self, state, order, outcome, count):
+        if order < 0:
+            raise UnsupportedOrder()
+        return super().next_state(state, order, outcome, count)
+
+
+@pytest.mark.parametrize('pool', [d12.pool(6), d12.pool(6)[:-1]])
+def test_canonicalize_state(pool):
+    evaluator = icepool.evaluator.LargestStraightEvaluator()
+    plain = UncanonicalizedStraightEvaluator()
+    assert evaluator.evaluate(pool) == plain.evaluate(pool)
+    assert AscendingStraightEvaluator().evaluate(pool) == plain.evaluate(pool)
+    assert sum(evaluator.state_counts(pool)) < sum(plain.state_counts(pool))
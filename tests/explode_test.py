@@ -30,3 +30,14 @@ def test_explode_d6(depth):
 def test_explode_multiple_weight(depth):
     result = icepool.d6.explode([5, 6], depth=depth)
     assert result.denominator() == 6**(depth + 1)
+
+
+@pytest.mark.parametrize('end', [None, icepool.Reroll, 100, icepool.d6])
+@pytest.mark.parametrize('depth', range(1, 4))
+def test_explode_matches_again(end, depth):
+    die = icepool.Die([0, 0, 1, 3, 3, 5])
+    result = die.explode([1, 5], depth=depth, end=end)
+    expected = die.map(lambda x: x + icepool.Again if x in [1, 5] else x,
+                       again_depth=depth,
+                       again_end=end)
+    assert result.equals(expected)
@@ -37,3 +37,86 @@ def test_union():
 def test_pos():
     assert (+d6.pool(2)[-1, -1]
             ^ +d6.pool(2)[-1, -1]).sum().probability(0) == 1
+
+
+def test_optimize_fuses_chains():
+    x = d6.pool(2) & d6.pool(3)
+    assert x.multiply_counts(2).multiply_counts(3)._optimize().equals(
+        x.multiply_counts(6))
+    assert x.unique(3).unique(2)._optimize().equals(x.unique(2))
+    assert x.keep_counts('>=', 1).keep_counts('>=', 2)._optimize().equals(
+        x.keep_counts('>=', 2))
+    filtered = x.keep_outcomes(lambda o: o > 2).drop_outcomes([5])
+    assert len(filtered._optimize()._children) == 1
+    assert filtered.expand() == x.keep_outcomes([3, 4, 6]).expand()
+
+
+def test_optimize_keep_generator_index():
+    pool = d6.pool(3)
+    expression = icepool.MultisetExpression.keep(pool, [..., 1, 1])
+    assert expression.sum() == pool[..., 1, 1].sum()
+    with pytest.raises(ValueError):
+        icepool.MultisetExpression.keep(pool, [0, 1, 1]).sum()
+
+
+def test_additive_union_many():
+    x = d6.pool(2) & d6.pool(1)
+    result = icepool.MultisetExpression.additive_union(x, x, x).size()
+    assert result == x.size() + x.size() + x.size()
+
+
+def test_filter_outcomes_collapses_pool():
+    pool = icepool.d20.pool(4)
+    expression = pool.keep_outcomes(lambda x: x >= 15,
+                                    collapse=True)._optimize()
+    assert len(expression._children[0].outcomes()) == 7
+    expected = icepool.d20.map(lambda x: x if x >= 15 else 0).pool(4).sum()
+    assert pool.keep_outcomes(lambda x: x >= 15,
+                              collapse=True).sum() == expected
+
+
+def test_filter_outcomes_collapses_deal():
+    deal = icepool.Deck(range(20)).deal(5)
+    expression = deal.drop_outcomes(lambda x: 5 <= x < 15,
+                                    collapse=True)._optimize()
+    assert len(expression._children[0].deck()) == 11
+    result = deal.drop_outcomes(lambda x: 5 <= x < 15, collapse=True).size()
+    expected = icepool.Deck([True] * 10 + [False] * 10).deal(5).keep_outcomes(
+        [True]).size()
+    assert result == expected
+
+
+def test_filter_outcomes_keeps_rank():
+    pool = icepool.d6.pool(4)[-2:]
+    assert pool.keep_outcomes([6],
+                              collapse=True)._optimize()._children[0] is pool
+
+
+def test_filter_outcomes_no_collapse_by_default():
+
+    class NumOutcomes(icepool.MultisetEvaluator):
+
+        def next_state(self, state, order, outcome, count):
+            return None
+
+        def final_outcome(self, final_state, order, outcomes, size):
+            return len(outcomes)
+
+    class Adjacent(icepool.MultisetEvaluator):
+        """Counts pairs of consecutive outcomes that both have elements."""
+
+        def next_state(self, state, order, outcome, count):
+            prev, total = state or (False, 0)
+            if prev and count > 0:
+                total += 1
+            return count > 0, total
+
+        def final_outcome(self, final_state, order, outcomes, size):
+            return final_state[1]
+
+    pool = icepool.d10.pool(3)
+    assert NumOutcomes().evaluate(pool.keep_outcomes(
+        lambda x: x >= 8)).probability(10) == 1
+    pool = icepool.d6.pool(3)
+    assert Adjacent().evaluate(pool.keep_outcomes([1, 3, 5])).probability(
+        0) == 1
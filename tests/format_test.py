@@ -37,3 +37,11 @@ format_specs = [
 @pytest.mark.parametrize('format_spec', format_specs)
 def test_format_spec(die, format_spec):
     f'{die:{format_spec}}'
+
+
+@pytest.mark.parametrize('die', test_dice)
+@pytest.mark.parametrize('format_spec', format_specs)
+def test_format_lines(die, format_spec):
+    lines = list(die.format_lines(format_spec))
+    assert all(line.endswith('\n') for line in lines)
+    assert ''.join(lines) == die.format(format_spec)
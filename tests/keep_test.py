@@ -294,3 +294,29 @@ def test_keep_known_size_descending():
         return x.force_order(Order.Descending)[0]
 
     assert test(d6.pool(3)) == d6.lowest(3)
+
+
+def test_bucket_pool():
+    pool = icepool.d100.pool(5).bucket([1, 50, 90])
+    assert pool.outcomes() == (1, 50, 90)
+    expected = icepool.d100.map(lambda x: 90 if x >= 90 else 50 if x >= 50 else 1)
+    assert pool.highest(2).sum() == expected.pool(5).highest(2).sum()
+
+
+def test_bucket_deal():
+    deal = icepool.Deck(range(10)).deal(3).bucket([0, 5])
+    assert deal.deck() == icepool.Deck({0: 5, 5: 5})
+    assert deal.count_subset([5, 5]) == icepool.Deck([0] * 5 + [5] * 5).deal(
+        3).count_subset([5, 5])
+
+
+def test_bucket_compound():
+    compound = d6.pool(1) + icepool.Deck(range(1, 7)).deal(2)
+    assert compound.bucket([1, 4]).keep_outcomes([4]).size() == (
+        d6.pool(1) + icepool.Deck(range(1, 7)).deal(2)).keep_outcomes(
+            lambda x: x >= 4).size()
+
+
+def test_bucket_below_first_boundary():
+    with pytest.raises(ValueError):
+        d6.pool(3).bucket([2, 4])
@@ -184,6 +184,13 @@ def test_mean_time_to_sum_coin():
     assert icepool.coin(1, 2).mean_time_to_sum(10) == 20
 
 
+def test_mean_time_to_sum_gaps():
+    die = Die([0, 0, 3, 7])
+    for target in [20, 5, 0, -1, 13]:
+        assert die.mean_time_to_sum(target) == Die([3, 7]).time_to_sum(
+            target).mean() * 2
+
+
 def test_fractional_coin():
     assert icepool.coin(Fraction(1, 3)) == (icepool.d(3) == 1)
 
@@ -246,9 +253,72 @@ def test_group_by_index():
     assert result['c'] == Die(['cat', 'crocodile'])
 
 
+def test_group_by_tuple_index():
+    result = d6.map(lambda x: (x, x % 2)).group_by[1]
+    assert result[0] == Die([(2, 0), (4, 0), (6, 0)])
+    assert result[1] == Die([(1, 1), (3, 1), (5, 1)])
+
+
 def test_kwargs():
 
     def test(x, *, die):
         return x @ die
 
     assert d6.map(test, die=d6) == d6 @ d6
+
+
+def test_map_iter():
+    step = lambda x, y: min(x + y, 10)
+    results = list(icepool.map_iter(step, 0, d6, repeat=5))
+    assert len(results) == 6
+    for i, result in enumerate(results):
+        assert result == map(step, 0, d6, repeat=i)
+
+
+def test_map_iter_early_stop():
+    results = list(Die([0]).map_iter(lambda x, y: min(x + y, 10), d6))
+    assert len(results) == 11
+    assert results[-1].probability(10) == 1
+
+
+def test_map_mapping_repeat():
+    mapping = {
+        0: Die([0, 1, 2]),
+        1: Die([0, 2, 3]),
+        2: icepool.Break(),
+        4: icepool.Reroll,
+    }
+
+    def func(x):
+        return mapping.get(x, x)
+
+    for repeat in [0, 1, 2, 5, 'inf']:
+        assert map(mapping, d(4) - 1, repeat=repeat).equals(
+            map(func, d(4) - 1, repeat=repeat), simplify=True)
+
+
+def test_markov_process_reuse():
+
+    def repl(x, y):
+        if x >= 10:
+            return x
+        return max(x + y, 0)
+
+    process = icepool.MarkovProcess(repl, Die([-1, 1, 2]))
+    for initial in [5, 0, d6, 12, Die([3, 11])]:
+        assert process.map(initial, repeat='inf') == map(repl,
+                                                         initial,
+                                                         Die([-1, 1, 2]),
+                                                         repeat='inf')
+        assert process.mean_time_to_absorb(
+            initial) == icepool.mean_time_to_absorb(repl, initial,
+                                                    Die([-1, 1, 2]))
+        assert process.map(initial, repeat=3) == map(repl,
+                                                     initial,
+                                                     Die([-1, 1, 2]),
+                                                     repeat=3)
+
+
+def test_map_repeat_mapping_kwargs():
+    with pytest.raises(TypeError):
+        map({1: 2}, d6, repeat='inf', extra=1)
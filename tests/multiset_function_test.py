@@ -104,3 +104,28 @@ def test_nested_call_branch():
         return x.sum(), inner(x)
 
     assert outer(d6.pool(3)) == (3 @ d6).map(lambda x: (x, x))
+
+
+def test_common_subexpression():
+    calls = 0
+
+    def count_function(outcome, a, b):
+        nonlocal calls
+        calls += 1
+        return min(a, b)
+
+    @multiset_function
+    def evaluator(a, b):
+        x = MultisetExpression.map_counts(a, b, function=count_function)
+        return x.size(), x.sum()
+
+    for dungeon, quest, sources, weight in evaluator._prepare(
+        (d6.pool(2), d6.pool(2)), {}):
+        room, arg_sizes = dungeon.initial_room(quest, sources,
+                                               icepool.Order.Ascending,
+                                               (1, 2, 3, 4, 5, 6), {})
+        _, count_tree = dungeon.next_state_tree(room.initial_statelet_tree,
+                                                icepool.Order.Ascending, 6,
+                                                iter((2, 1)), ())
+        assert count_tree == ((1, ), (1, ))
+        assert calls == 1
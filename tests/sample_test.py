@@ -1,5 +1,6 @@
 import pytest
 import icepool
+import random
 
 
 def test_die_sample():
@@ -8,22 +9,87 @@ def test_die_sample():
     assert result <= 6
 
 
-@pytest.mark.skip(reason="sampling expressions not supported for now")
+def test_die_sample_n():
+    result = icepool.d6.sample(100)
+    assert len(result) == 100
+    assert all(1 <= x <= 6 for x in result)
+
+
+def test_die_sample_seed():
+    a = icepool.d6.sample(100, rng=random.Random(42))
+    b = icepool.d6.sample(100, rng=random.Random(42))
+    assert a == b
+
+
+def test_die_sample_numpy():
+    numpy = pytest.importorskip('numpy')
+    die = icepool.Die({1: 1, 2: 0, 3: 2})
+    a = die.sample(1000, rng=numpy.random.default_rng(42))
+    b = die.sample(1000, rng=numpy.random.default_rng(42))
+    assert a == b
+    assert set(a) == {1, 3}
+
+
 def test_deck_sample():
     result = icepool.Deck({'A': 1, 'B': 2, 'C': 3}).sample()
     assert result in ['A', 'B', 'C']
 
 
-@pytest.mark.skip(reason="sampling expressions not supported for now")
 def test_pool_sample():
     result = icepool.d_pool([6, 6, 6, 8])[:-1].sample()
+    assert len(result) == 3
     assert all(x >= 1 for x in result)
     assert all(x <= 6 for x in result)
 
 
-@pytest.mark.skip(
-    reason="still need to figure out how to sample multiset tuples")
+def test_pool_sample_keep_tuple():
+    pool = icepool.d6.pool(4)[-1, 0, 2, ...]
+    with pytest.raises(ValueError):
+        pool.sample()
+    result = icepool.d6.pool(4)[0, 1, 2, 0].sample(100, rng=random.Random(0))
+    assert all(len(x) == 3 and x[1] == x[2] for x in result)
+    assert all(list(x) == sorted(x) for x in result)
+
+
+def test_pool_sample_numpy():
+    numpy = pytest.importorskip('numpy')
+    pool = icepool.d6.pool(3) + icepool.d8.pool(2)
+    a = pool.sample(1000, rng=numpy.random.default_rng(42))
+    b = pool.sample(1000, rng=numpy.random.default_rng(42))
+    assert a == b
+    assert all(list(x) == sorted(x) for x in a)
+    assert any(8 in x for x in a)
+
+
 def test_deal_sample():
-    a, b = icepool.Deck({'A': 1, 'B': 2, 'C': 3}).deal(3, 2).sample()
+    result = icepool.Deck({'A': 1, 'B': 2, 'C': 3}).deal(4).sample(100)
+    assert all(x.count('A') <= 1 and x.count('B') <= 2 for x in result)
+
+
+def test_multi_deal_sample():
+    a, b = icepool.Deck({'A': 1, 'B': 2, 'C': 3}).deal((3, 2)).sample()
+    assert len(a) == 3
+    assert len(b) == 2
     assert all(x in ['A', 'B', 'C'] for x in a)
     assert all(x in ['A', 'B', 'C'] for x in b)
+    assert (a + b).count('A') <= 1
+
+
+def test_multi_deal_sample_numpy():
+    numpy = pytest.importorskip('numpy')
+    deal = icepool.Deck({'A': 1, 'B': 2, 'C': 3}).deal((2, 1))
+    result = deal.sample(6000, rng=numpy.random.default_rng(42))
+    assert all((a + b).count('A') <= 1 for a, b in result)
+    # Each card is equally likely to be the one in the second hand.
+    count_a = sum(b == ('A', ) for a, b in result)
+    assert 800 < count_a < 1200
+
+
+def test_alias_table():
+    die = icepool.Die({1: 3, 2: 0, 3: 1, 4: 8})
+    thresholds, aliases = die._alias_table
+    counts = [0] * len(die)
+    for i, (threshold, alias) in enumerate(zip(thresholds, aliases)):
+        counts[i] += threshold
+        counts[alias] += die.denominator() - threshold
+    assert counts == [q * len(die) for q in die.quantities()]
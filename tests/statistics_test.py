@@ -44,10 +44,34 @@ def test_max_quantile():
     assert icepool.d6.quantile_high(100) == 6
 
 
+@pytest.mark.parametrize('die', [3 @ d6, Die([1, 1, 5, 9]), d6 / 3])
+def test_standardized_moment(die):
+    mean = die.mean()
+    for k in range(1, 6):
+        expected = sum(p * (outcome - mean)**k
+                       for outcome, p in zip(die.outcomes(),
+                                             die.probabilities()))
+        assert die.standardized_moment(k) == pytest.approx(expected /
+                                                          die.sd()**k)
+
+
+def test_covariance():
+    die = icepool.map(lambda a, b, c: (a, a + b, c), d6, d6, icepool.d4)
+    assert die.covariance(0, 1) == d6.variance()
+    assert die.covariance(0, 2) == 0
+    assert die.correlation(0, 1) == pytest.approx(0.5**0.5)
+    assert die.marginals[1].equals(d6 + d6, simplify=True)
+    assert die.marginals[2].equals(icepool.d4, simplify=True)
+
+
 def test_entropy_with_zeros():
     assert Die({1: 1, 2: 0, 3: 1}).entropy() == 1.0
 
 
+def test_entropy_empty():
+    assert Die([]).entropy() == 0
+
+
 @pytest.mark.parametrize('comparison', ['==', '!=', '<=', '<', '>=', '>'])
 def test_percent(comparison):
     die = 3 @ d6
@@ -73,3 +97,8 @@ def test_pad_to_denominator_zero():
 def test_pad_to_denominator_negative_error():
     with pytest.raises(ValueError):
         deck = Deck([0, 0, 0, 1, 2, 3]).pad_to_denominator(2, 0)
+
+
+def test_variance_float_overflow():
+    with pytest.raises(OverflowError):
+        Die([0.5, 1e200]).variance()